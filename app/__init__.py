@@ -9,6 +9,7 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.config import Config
+from app.responses import FastJSONResponse
 from app.routes.extract import router as extract_router
 from app.routes.predictions import router as predictions_router
 from app.routes.ui import router as ui_router
@@ -17,7 +18,10 @@ from app.routes.ui import router as ui_router
 def create_app(config: Optional[Config] = None) -> FastAPI:
     """Construye la instancia de :class:`FastAPI` con rutas y configuración."""
 
-    app = FastAPI(title="Verifactura Extraction API")
+    # orjson serializa las respuestas JSON en C, más rápido que el módulo estándar
+    app = FastAPI(
+        title="Verifactura Extraction API", default_response_class=FastJSONResponse
+    )
     # Almacenar la configuración en el estado permite accederla desde los routers
     app.state.config = config or Config()
     static_dir = Path(__file__).resolve().parent / "static"
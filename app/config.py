@@ -28,13 +28,28 @@ class Config:
     AZURE_ENDPOINT: Optional[str] = os.getenv("AZURE_FORM_RECOGNIZER_ENDPOINT")
     AZURE_KEY: Optional[str] = os.getenv("AZURE_FORM_RECOGNIZER_KEY")
 
+    # Número máximo de páginas enviadas en paralelo al OCR de Azure
+    OCR_PAGE_CONCURRENCY: int = int(os.getenv("OCR_PAGE_CONCURRENCY", "4"))
+
+    # Lado máximo (px) de las imágenes enviadas a los modelos con Visión
+    VISION_MAX_IMAGE_SIDE: int = int(os.getenv("VISION_MAX_IMAGE_SIDE", "2048"))
+
     # Parámetros de extracción y rutas a recursos auxiliares
     MAX_CHARS_PER_CHUNK: int = int(os.getenv("MAX_CHARS_PER_CHUNK", "50000"))
+    PDF_DIGITAL_TEXT_MIN_CHARS: int = int(os.getenv("PDF_DIGITAL_TEXT_MIN_CHARS", "1000"))
     JSON_MODE_SCHEMA_NAME: str = os.getenv("JSON_MODE_SCHEMA_NAME", "factura_vehicular")
     RF_MODEL_PATH: str = os.getenv("RF_MODEL_PATH", "verifactura_rf_model.pkl")
     RF_TRAINING_DATA_PATH: str = os.getenv(
         "RF_TRAINING_DATA_PATH", "train/data/verifactura_dataset.csv"
     )
+    # Clasificador del reentrenamiento: "random_forest" o "hist_gradient_boosting"
+    RF_ESTIMATOR: str = os.getenv("RF_ESTIMATOR", "random_forest")
+    # Entrena el Random Forest en GPU con cuML cuando está instalado
+    RF_USE_GPU: bool = os.getenv("RF_USE_GPU", "false").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
 
     @property
     def azure_configured(self) -> bool:
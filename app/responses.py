@@ -0,0 +1,25 @@
+"""Respuestas HTTP compartidas por la aplicación."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:  # pragma: no cover - dependencia opcional en tiempo de importación
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - se usa el serializador estándar
+    orjson = None  # type: ignore[assignment]
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON serializada con orjson cuando está instalado."""
+
+    def render(self, content: Any) -> bytes:
+        """Convierte ``content`` en bytes JSON, recurriendo a ``json`` sin orjson."""
+
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any, Dict, Literal, Optional, Union
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.params import Param
 from pydantic import BaseModel, Field
 
@@ -172,7 +173,9 @@ async def extract_from_text_endpoint(
             status_code=400,
             detail="El texto proporcionado está vacío.",
         )
-    result = service.extract_from_text(
+    # El cliente LLM es síncrono: se ejecuta fuera del event loop
+    result = await run_in_threadpool(
+        service.extract_from_text,
         text,
         provider=payload.llm_provider,
         model=payload.llm_model,
@@ -284,7 +287,8 @@ async def extract_from_file_endpoint(
     force_ocr_flag = _normalize_flag(force_ocr)
     use_vision_flag = _normalize_flag(use_vision)
     try:
-        result = service.extract_from_file(
+        result = await run_in_threadpool(
+            service.extract_from_file,
             file.filename or "archivo",
             data,
             file.content_type,
@@ -414,7 +418,8 @@ async def extract_from_image_endpoint(
     use_vision_flag = _normalize_flag(use_vision)
     use_ocr_flag = _normalize_flag(use_ocr)
     try:
-        result = service.extract_from_image(
+        result = await run_in_threadpool(
+            service.extract_from_image,
             image.filename or "imagen",
             data,
             image.content_type,
@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
+import re
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from pydantic import BaseModel, Field, conint, confloat, validator
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, field_validator
 
 from app.config import Config
-from app.services.prediction_service import PredictionService
+from app.services.prediction_service import PredictionResult, PredictionService
 from app.services.training_service import TrainingService
 
 router = APIRouter(tags=["Predicciones"])
 
+# Todo lo que no sea dígito, signo o separador se descarta de los números
+_NUMBER_NOISE_RE = re.compile(r"[^\d,.\-]+")
+# Coma decimal: se eliminan los puntos de miles y la coma pasa a punto
+_DECIMAL_COMMA_TABLE = str.maketrans({".": None, ",": "."})
+# Punto decimal: se eliminan las comas de miles
+_DECIMAL_POINT_TABLE = str.maketrans({",": None})
+
 
 class PredictionRequest(BaseModel):
     """Representa la solicitud necesaria para generar una predicción."""
@@ -21,12 +30,13 @@ class PredictionRequest(BaseModel):
     marca: str = Field(..., description="Marca del vehículo en mayúsculas.")
     tipo: str = Field(..., description="Tipo del vehículo (por ejemplo, SEDAN).")
     clase: str = Field(..., description="Clase del vehículo.")
-    capacidad: conint(ge=0) = Field(..., description="Capacidad de pasajeros.")
+    capacidad: int = Field(..., ge=0, description="Capacidad de pasajeros.")
     combustible: str = Field(..., description="Tipo de combustible.")
-    ruedas: conint(ge=0) = Field(..., description="Número total de ruedas.")
-    total: confloat(ge=0) = Field(..., description="Monto total del comprobante.")
+    ruedas: int = Field(..., ge=0, description="Número total de ruedas.")
+    total: float = Field(..., ge=0, description="Monto total del comprobante.")
 
-    @validator("marca", "tipo", "clase", "combustible", pre=True)
+    @field_validator("marca", "tipo", "clase", "combustible", mode="before")
+    @classmethod
     def _normalize_text(cls, value: Any) -> str:
         """Estandariza el texto recibido eliminando espacios y usando mayúsculas."""
         if isinstance(value, str):
@@ -36,7 +46,8 @@ class PredictionRequest(BaseModel):
             return cleaned.upper()
         raise ValueError("El valor debe ser una cadena de texto.")
 
-    @validator("capacidad", "ruedas", pre=True)
+    @field_validator("capacidad", "ruedas", mode="before")
+    @classmethod
     def _coerce_int(cls, value: Any) -> int:
         """Convierte el valor a entero redondeando y validando que sea positivo."""
         number = PredictionRequest._parse_number(value)
@@ -44,7 +55,8 @@ class PredictionRequest(BaseModel):
             raise ValueError("El valor debe ser mayor o igual a cero.")
         return int(round(number))
 
-    @validator("total", pre=True)
+    @field_validator("total", mode="before")
+    @classmethod
     def _coerce_float(cls, value: Any) -> float:
         """Transforma las entradas numéricas a float garantizando valores válidos."""
         number = PredictionRequest._parse_number(value)
@@ -61,16 +73,13 @@ class PredictionRequest(BaseModel):
             cleaned = value.strip()
             if not cleaned:
                 raise ValueError("El valor no puede estar vacío.")
-            normalized = cleaned.replace(" ", "")
-            filtered = "".join(ch for ch in normalized if ch.isdigit() or ch in {"-", ",", "."})
+            filtered = _NUMBER_NOISE_RE.sub("", cleaned)
             if not filtered:
                 raise ValueError("El valor no contiene dígitos.")
-            last_comma = filtered.rfind(",")
-            last_dot = filtered.rfind(".")
-            if last_comma > last_dot:
-                candidate = filtered.replace(".", "").replace(",", ".")
+            if filtered.rfind(",") > filtered.rfind("."):
+                candidate = filtered.translate(_DECIMAL_COMMA_TABLE)
             else:
-                candidate = filtered.replace(",", "")
+                candidate = filtered.translate(_DECIMAL_POINT_TABLE)
             try:
                 return float(candidate)
             except ValueError as exc:  # pragma: no cover - validaciones defensivas
@@ -79,15 +88,8 @@ class PredictionRequest(BaseModel):
 
     def to_features(self) -> Dict[str, object]:
         """Serializa el modelo de datos en un diccionario listo para el modelo."""
-        return {
-            "marca": self.marca,
-            "tipo": self.tipo,
-            "clase": self.clase,
-            "capacidad": int(self.capacidad),
-            "combustible": self.combustible,
-            "ruedas": int(self.ruedas),
-            "total": float(self.total),
-        }
+        # Los validadores ya entregan ``int`` y ``float``: basta con el volcado nativo
+        return self.model_dump()
 
 
 class PredictionProbability(BaseModel):
@@ -109,6 +111,22 @@ class PredictionResponse(BaseModel):
     )
 
 
+class BatchPredictionRequest(BaseModel):
+    """Agrupa varias solicitudes para clasificarlas en una sola llamada."""
+
+    solicitudes: list[PredictionRequest] = Field(
+        ..., min_length=1, description="Solicitudes de predicción a evaluar."
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Predicciones devueltas en el mismo orden que las solicitudes."""
+
+    predicciones: list[PredictionResponse] = Field(
+        ..., description="Resultado de cada solicitud del lote."
+    )
+
+
 class RetrainResponse(BaseModel):
     """Estructura devuelta tras ejecutar el reentrenamiento del modelo."""
 
@@ -119,11 +137,11 @@ class RetrainResponse(BaseModel):
     clases: list[str] = Field(
         ..., description="Listado de clases conocidas por el modelo entrenado."
     )
-    muestras_entrenamiento: conint(ge=0) = Field(
-        ..., description="Cantidad de muestras utilizadas para el entrenamiento."
+    muestras_entrenamiento: int = Field(
+        ..., ge=0, description="Cantidad de muestras utilizadas para el entrenamiento."
     )
-    muestras_validacion: conint(ge=0) = Field(
-        ..., description="Cantidad de muestras utilizadas para la validación."
+    muestras_validacion: int = Field(
+        ..., ge=0, description="Cantidad de muestras utilizadas para la validación."
     )
     matriz_confusion: list[list[int]] = Field(
         ..., description="Matriz de confusión calculada en el conjunto de validación."
@@ -159,6 +177,21 @@ def _get_prediction_service(request: Request) -> PredictionService:
     return service
 
 
+def _build_prediction_response(
+    result: PredictionResult, features: Dict[str, object]
+) -> PredictionResponse:
+    """Convierte el resultado del servicio en la respuesta expuesta por la API."""
+    probabilities = [
+        PredictionProbability(clase=label, probabilidad=prob)
+        for label, prob in result.probabilities.items()
+    ]
+    return PredictionResponse(
+        categoria_predicha=result.predicted_class,
+        probabilidades=probabilities,
+        valores_entrada=features,
+    )
+
+
 @router.post(
     "/predictions",
     response_model=PredictionResponse,
@@ -170,20 +203,40 @@ async def create_prediction(
     """Expone la inferencia del modelo Random Forest como endpoint HTTP."""
     features = payload.to_features()
     try:
-        result = service.predict(features)
+        # La inferencia del modelo es síncrona: se ejecuta fuera del event loop
+        result = await run_in_threadpool(service.predict, features)
     except Exception as exc:  # pragma: no cover - errores en la capa del modelo
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="No se pudo calcular la predicción solicitada.",
         ) from exc
-    ordered = list(result.probabilities.items())
-    probabilities = [
-        PredictionProbability(clase=label, probabilidad=prob) for label, prob in ordered
-    ]
-    return PredictionResponse(
-        categoria_predicha=result.predicted_class,
-        probabilidades=probabilities,
-        valores_entrada=features,
+    return _build_prediction_response(result, features)
+
+
+@router.post(
+    "/predictions/batch",
+    response_model=BatchPredictionResponse,
+    summary="Obtener las categorías estimadas para un lote de solicitudes",
+)
+async def create_batch_prediction(
+    payload: BatchPredictionRequest,
+    service: PredictionService = Depends(_get_prediction_service),
+) -> BatchPredictionResponse:
+    """Clasifica todas las solicitudes del lote con una sola pasada del modelo."""
+    features_list = [item.to_features() for item in payload.solicitudes]
+    try:
+        # Un lote grande ocupa la CPU: se evalúa fuera del event loop
+        results = await run_in_threadpool(service.predict_batch, features_list)
+    except Exception as exc:  # pragma: no cover - errores en la capa del modelo
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="No se pudo calcular la predicción solicitada.",
+        ) from exc
+    return BatchPredictionResponse(
+        predicciones=[
+            _build_prediction_response(result, features)
+            for result, features in zip(results, features_list)
+        ]
     )
 
 
@@ -197,9 +250,15 @@ async def retrain_prediction_model(request: Request) -> RetrainResponse:
     config: Config = getattr(request.app.state, "config", Config())
     dataset_path = Path(config.RF_TRAINING_DATA_PATH).expanduser()
     model_path = Path(config.RF_MODEL_PATH).expanduser()
-    training_service = TrainingService(dataset_path=dataset_path, model_path=model_path)
+    training_service = TrainingService(
+        dataset_path=dataset_path,
+        model_path=model_path,
+        estimator=config.RF_ESTIMATOR,
+        use_gpu=config.RF_USE_GPU,
+    )
     try:
-        result = training_service.retrain_random_forest()
+        # El entrenamiento bloquea varios segundos: se ejecuta fuera del event loop
+        result = await run_in_threadpool(training_service.retrain_random_forest)
     except FileNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -224,11 +283,12 @@ async def retrain_prediction_model(request: Request) -> RetrainResponse:
         service: Optional[PredictionService] = getattr(
             request.app.state, "prediction_service", None
         )
+        # ``joblib.load`` bloquea: la carga del modelo se hace fuera del event loop
         if service is None:
-            service = PredictionService(model_path)
+            service = await run_in_threadpool(PredictionService, model_path)
             request.app.state.prediction_service = service
         else:
-            service.reload()
+            await run_in_threadpool(service.reload)
         servicio_recargado = True
     except Exception:
         request.app.state.prediction_service = None
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import base64
+import io
 import logging
 import mimetypes
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
@@ -15,11 +18,25 @@ from app.services.llm_service import LocalLLMService, OpenAILLMService
 from app.services.ocr_service import AzureOCRConfig, AzureOCRService
 from app.services.pdf_service import PDFTextExtractor
 
+try:  # pragma: no cover - dependencia opcional
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover - sin Pillow se envían los bytes originales
+    Image = None  # type: ignore
+
 # Conjuntos de extensiones soportadas que determinan la ruta de procesamiento
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
 TEXT_EXTENSIONS = {".json"}
 XML_EXTENSIONS = {".xml"}
 PDF_EXTENSIONS = {".pdf"}
+# Formatos de imagen que aceptan directamente los modelos con Visión
+VISION_MEDIA_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+# Señales mínimas para considerar que un texto OCR proviene de una factura
+# (el OCR suele entregar siglas con puntos o espacios: "R.U.C.", "R U C", "I.V.A.")
+_INVOICE_CUE_RE = re.compile(
+    r"\b(?:R\.?\s?U\.?\s?C|I\.?\s?V\.?\s?A|FACTURA|SUBTOTAL|TOTAL)\b",
+    re.IGNORECASE,
+)
+_INVOICE_MIN_DIGITS = 6
 
 
 LOGGER = logging.getLogger(__name__)
@@ -64,6 +81,11 @@ class ExtractionService:
         # Cache de clientes OCR organizada por tupla (proveedor, endpoint, clave)
         self._ocr_cache: Dict[Tuple[str, str, str], AzureOCRService] = {}
         self._default_ocr_key: Optional[Tuple[str, str, str]] = None
+        # Las páginas renderizadas se envían al OCR en paralelo (llamadas de red)
+        self._ocr_executor = ThreadPoolExecutor(
+            max_workers=max(1, config.OCR_PAGE_CONCURRENCY),
+            thread_name_prefix="ocr-page",
+        )
         if config.azure_configured:
             endpoint = (config.AZURE_ENDPOINT or "").strip()
             key = (config.AZURE_KEY or "").strip()
@@ -135,6 +157,26 @@ class ExtractionService:
         # arroja contenido.
         return extension in IMAGE_EXTENSIONS
 
+    @staticmethod
+    def _looks_like_invoice(text: str) -> bool:
+        """Filtro barato que descarta texto OCR sin indicios de ser una factura."""
+
+        if _INVOICE_CUE_RE.search(text) is None:
+            return False
+        return sum(char.isdigit() for char in text) >= _INVOICE_MIN_DIGITS
+
+    def _read_born_digital_text(self, data: bytes) -> Optional[str]:
+        """Devuelve el texto embebido del PDF si basta para omitir el OCR."""
+
+        threshold = self._config.PDF_DIGITAL_TEXT_MIN_CHARS
+        if threshold <= 0:
+            return None
+        try:
+            text = self._pdf.read_text(data)
+        except Exception:
+            return None
+        return text if len(text) >= threshold else None
+
     @staticmethod
     def _normalize_image_media_type(data: bytes, content_type: Optional[str]) -> str:
         """Intenta inferir el tipo MIME adecuado para una imagen en base a su contenido."""
@@ -150,6 +192,36 @@ class ExtractionService:
             return "image/tiff"
         return "image/png"
 
+    def _prepare_vision_image(self, data: bytes, media_type: str) -> Tuple[bytes, str]:
+        """Reduce y recodifica la imagen una única vez cuando es grande o no compatible."""
+
+        if Image is None:
+            return data, media_type
+        max_side = self._config.VISION_MAX_IMAGE_SIDE
+        try:
+            # `Image.open` solo lee la cabecera; los píxeles se decodifican si hace falta
+            image = Image.open(io.BytesIO(data))
+            too_large = max_side > 0 and max(image.size) > max_side
+            if media_type in VISION_MEDIA_TYPES and not too_large:
+                return data, media_type
+            image.load()
+            if too_large:
+                image.thumbnail((max_side, max_side), Image.LANCZOS)
+            if media_type == "image/jpeg":
+                target_format, target_type = "JPEG", "image/jpeg"
+                if image.mode not in ("L", "RGB"):
+                    image = image.convert("RGB")
+            else:
+                target_format, target_type = "PNG", "image/png"
+                if image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+                    image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, format=target_format)
+        except Exception:
+            LOGGER.warning("No se pudo optimizar la imagen para Visión; se envía la original.")
+            return data, media_type
+        return buffer.getvalue(), target_type
+
     def _encode_vision_images(
         self,
         images: Iterable[Tuple[bytes, Optional[str]]],
@@ -162,6 +234,7 @@ class ExtractionService:
             if not data:
                 continue
             normalized = self._normalize_image_media_type(data, media_type)
+            data, normalized = self._prepare_vision_image(data, normalized)
             encoded.append(
                 {
                     "media_type": normalized,
@@ -202,12 +275,14 @@ class ExtractionService:
                     "No se pudo extraer texto del PDF mediante OCR."
                 )
             return text
-        fragments = []
-        for image_data, content_type in images:
-            text = ocr_service.extract_text(image_data, content_type=content_type)
-            if text:
-                fragments.append(text)
-        joined = "\n\n".join(fragment.strip() for fragment in fragments if fragment.strip())
+        # `map` conserva el orden de las páginas aunque terminen en otro orden
+        fragments = self._ocr_executor.map(
+            lambda image: ocr_service.extract_text(image[0], content_type=image[1]),
+            images,
+        )
+        joined = "\n\n".join(
+            fragment.strip() for fragment in fragments if fragment and fragment.strip()
+        )
         if not joined:
             raise RuntimeError("No se pudo extraer texto del PDF mediante OCR.")
         return joined
@@ -309,10 +384,13 @@ class ExtractionService:
             normalized_content_type = guessed.lower() if guessed else None
 
         if suffix in PDF_EXTENSIONS or normalized_content_type == "application/pdf":
-            return self.extract_from_file(
+            # Los PDF nativos digitales ya contienen el texto: se evita el OCR remoto
+            # y se reutiliza el texto leído para no analizar el PDF dos veces
+            return self._extract_from_text_or_file(
                 filename,
                 data,
                 normalized_content_type,
+                text=self._read_born_digital_text(data) if use_ocr else None,
                 force_ocr=use_ocr,
                 use_vision=use_vision,
                 provider=provider,
@@ -354,6 +432,9 @@ class ExtractionService:
             )
             if not text:
                 raise RuntimeError("No se pudo extraer texto de la imagen ingresada")
+            # Sin Visión el modelo solo vería este texto: se evita una llamada inútil
+            if not use_vision and not self._looks_like_invoice(text):
+                raise RuntimeError("El texto no parece una factura")
             text_origin = "ocr"
 
         vision_images: Optional[List[Dict[str, str]]] = None
@@ -399,6 +480,54 @@ class ExtractionService:
     ) -> ExtractionResult:
         """Decide si se debe aplicar OCR o lectura directa antes de usar el LLM."""
 
+        return self._extract_from_text_or_file(
+            filename,
+            data,
+            content_type,
+            force_ocr=force_ocr,
+            use_vision=use_vision,
+            image_use_ocr=image_use_ocr,
+            provider=provider,
+            model=model,
+            temperature=temperature,
+            top_p=top_p,
+            reasoning_effort=reasoning_effort,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+            openai_api_key=openai_api_key,
+            ocr_provider=ocr_provider,
+            ocr_endpoint=ocr_endpoint,
+            ocr_key=ocr_key,
+        )
+
+    def _extract_from_text_or_file(
+        self,
+        filename: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        *,
+        text: Optional[str] = None,
+        force_ocr: bool = False,
+        use_vision: bool = False,
+        image_use_ocr: Optional[bool] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        reasoning_effort: Optional[str] = None,
+        frequency_penalty: Optional[float] = None,
+        presence_penalty: Optional[float] = None,
+        openai_api_key: Optional[str] = None,
+        ocr_provider: Optional[str] = None,
+        ocr_endpoint: Optional[str] = None,
+        ocr_key: Optional[str] = None,
+    ) -> ExtractionResult:
+        """Implementa :meth:`extract_from_file` partiendo opcionalmente de ``text``.
+
+        ``text`` es el texto ya leído de un PDF digital; cuando se entrega no se
+        vuelve a analizar el PDF ni se fuerza el OCR.
+        """
+
         suffix = Path(filename).suffix.lower()
         normalized_content_type = (content_type or "").lower()
         force_ocr = bool(force_ocr)
@@ -435,9 +564,8 @@ class ExtractionService:
                 ocr_key=ocr_key,
                 openai_api_key=openai_api_key,
             )
-        if force_ocr and suffix not in PDF_EXTENSIONS:
+        if force_ocr and (suffix not in PDF_EXTENSIONS or text is not None):
             force_ocr = False
-        text = ""
         ocr_service_instance: Optional[AzureOCRService] = None
         vision_images: Optional[List[Dict[str, str]]] = None
 
@@ -456,11 +584,13 @@ class ExtractionService:
 
         text_origin: Literal["file", "ocr"] = "file"
 
-        if not force_ocr:
-            if suffix in PDF_EXTENSIONS:
-                text = self._pdf.read_text(data)
-            elif suffix in TEXT_EXTENSIONS or suffix in XML_EXTENSIONS:
-                text = data.decode("utf-8", errors="replace")
+        if text is None:
+            text = ""
+            if not force_ocr:
+                if suffix in PDF_EXTENSIONS:
+                    text = self._pdf.read_text(data)
+                elif suffix in TEXT_EXTENSIONS or suffix in XML_EXTENSIONS:
+                    text = data.decode("utf-8", errors="replace")
         if force_ocr or self._needs_ocr(suffix, text):
             text = self._extract_text_from_file(
                 filename,
@@ -469,6 +599,8 @@ class ExtractionService:
                 force_ocr=force_ocr,
                 ocr_service=require_ocr_service(),
             )
+            if not use_vision and not self._looks_like_invoice(text):
+                raise RuntimeError("El texto no parece una factura")
             text_origin = "ocr"
         if use_vision and suffix in PDF_EXTENSIONS:
             try:
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 """Servicios concretos para interactuar con modelos de lenguaje (API y local)."""
 
-import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import torch
 from openai import OpenAI
+from pydantic import TypeAdapter, ValidationError
 from transformers import (
     AutoConfig,
     AutoModelForCausalLM,
@@ -17,6 +19,11 @@ from transformers import (
 
 from app.config import Config
 
+try:  # pragma: no cover - dependencia opcional en tiempo de importación
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - se usa el analizador de pydantic
+    orjson = None  # type: ignore[assignment]
+
 INVOICE_SCHEMA: Dict[str, Any] = {
     "type": "object",
     "additionalProperties": False,
@@ -81,16 +88,27 @@ SYSTEM_PROMPT = (
 )
 
 
+# Validador precompilado: pydantic-core analiza el JSON y exige un objeto en una pasada
+_RESPONSE_ADAPTER: TypeAdapter[Dict[str, Any]] = TypeAdapter(Dict[str, Any])
+
+
 def _parse_model_response(raw: str) -> Dict[str, Any]:
     """Convierte la respuesta textual del modelo en un diccionario Python."""
 
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as exc:  # pragma: no cover - defensive programming
+        if orjson is not None:
+            # orjson decodifica más rápido respuestas extensas; el adaptador valida la forma
+            return _RESPONSE_ADAPTER.validate_python(orjson.loads(raw))
+        return _RESPONSE_ADAPTER.validate_json(raw)
+    except (ValueError, ValidationError) as exc:
         raise RuntimeError(
             "El modelo no devolvió un JSON válido conforme al esquema solicitado."
         ) from exc
-    return data
+
+
+# Intentos máximos ante respuestas que no cumplen el formato JSON solicitado
+_MAX_RESPONSE_ATTEMPTS = 3
+
 
 class OpenAILLMService:
     """Cliente especializado para llamar a la API de OpenAI con esquema JSON."""
@@ -99,12 +117,6 @@ class OpenAILLMService:
         """Inicializa el cliente recordando valores por defecto y credenciales."""
 
         self._configured_api_key = (config.OPENAI_API_KEY or "").strip()
-        self._client = (
-            OpenAI(api_key=self._configured_api_key)
-            if self._configured_api_key
-            else None
-        )
-        self._runtime_api_key: Optional[str] = None
         self._model = config.OPENAI_MODEL
         self._schema_name = config.JSON_MODE_SCHEMA_NAME
         self._default_temperature = 1.0
@@ -112,6 +124,27 @@ class OpenAILLMService:
         self._default_reasoning_effort = None
         self._default_frequency_penalty = 0.0
         self._default_presence_penalty = 0.0
+        # Cliente de la clave configurada, creado al primer uso y reutilizado
+        self._client: Optional[OpenAI] = None
+        self._client_lock = threading.Lock()
+
+    @contextmanager
+    def _client_for(self, api_key: str) -> Iterator[OpenAI]:
+        """Entrega el cliente compartido o uno temporal para claves del usuario."""
+
+        if api_key == self._configured_api_key:
+            if self._client is None:
+                with self._client_lock:
+                    if self._client is None:
+                        self._client = OpenAI(api_key=api_key)
+            yield self._client
+            return
+        # Las claves proporcionadas por solicitud no se retienen en memoria
+        client = OpenAI(api_key=api_key)
+        try:
+            yield client
+        finally:
+            client.close()
 
     def extract(
         self,
@@ -142,15 +175,6 @@ class OpenAILLMService:
             raise RuntimeError(
                 "Proporciona una clave de API de OpenAI válida para completar la solicitud."
             )
-        client = self._client
-        if client is None or (
-            resolved_api_key != self._configured_api_key
-            and resolved_api_key != self._runtime_api_key
-        ):
-            client = OpenAI(api_key=resolved_api_key)
-            if not self._configured_api_key:
-                self._client = client
-                self._runtime_api_key = resolved_api_key
         selected_frequency_penalty = (
             self._default_frequency_penalty
             if frequency_penalty is None
@@ -199,24 +223,56 @@ class OpenAILLMService:
         if selected_presence_penalty is not None:
             additional_params["presence_penalty"] = selected_presence_penalty
     
-        response = client.chat.completions.create(
-            model=chosen_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_content},
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": self._schema_name,
-                    "schema": INVOICE_SCHEMA,
-                    "strict": True,
-                },
-            },
-            **additional_params,
-        )
-        content = response.choices[0].message.content
-        return _parse_model_response(content)
+        messages: List[Dict[str, Any]] = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_content},
+        ]
+        with self._client_for(resolved_api_key) as client:
+            last_error: Optional[RuntimeError] = None
+            for _attempt in range(_MAX_RESPONSE_ATTEMPTS):
+                response = client.chat.completions.create(
+                    model=chosen_model,
+                    messages=messages,
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {
+                            "name": self._schema_name,
+                            "schema": INVOICE_SCHEMA,
+                            "strict": True,
+                        },
+                    },
+                    stream=True,
+                    **additional_params,
+                )
+                # Se acumulan los fragmentos a medida que llegan en lugar de esperar la respuesta
+                parts: List[str] = []
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                content = "".join(parts)
+                try:
+                    return _parse_model_response(content)
+                except RuntimeError as exc:
+                    last_error = exc
+                    # Se devuelve el error al modelo para que corrija su propia salida
+                    detail = exc.__cause__ or exc
+                    messages = messages + [
+                        {"role": "assistant", "content": content},
+                        {
+                            "role": "user",
+                            "content": (
+                                f"Tu respuesta anterior no es válida: {detail}. "
+                                "Corrígela y responde únicamente con JSON válido."
+                            ),
+                        },
+                    ]
+            raise RuntimeError(
+                "El modelo no devolvió un JSON válido tras "
+                f"{_MAX_RESPONSE_ATTEMPTS} intentos."
+            ) from last_error
 
 
 class LocalLLMService:
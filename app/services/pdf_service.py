@@ -3,19 +3,48 @@
 from __future__ import annotations
 
 import io
-from typing import List, Optional, Tuple
+import re
+from bisect import bisect_right
+from functools import cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
 from PyPDF2 import PdfReader
 
-try:  # pragma: no cover - optional dependency
-    from pdf2image import convert_from_bytes  # type: ignore
-except Exception:  # pragma: no cover - if dependency missing we fall back later
-    convert_from_bytes = None  # type: ignore
 
-try:  # pragma: no cover - optional dependency
-    import fitz  # type: ignore
-except Exception:  # pragma: no cover - optional dependency not installed
-    fitz = None  # type: ignore
+@cache
+def _load_pdf2image() -> Optional[Callable[..., Any]]:
+    """Importa ``pdf2image`` sólo la primera vez que se necesita renderizar."""
+
+    try:  # pragma: no cover - optional dependency
+        from pdf2image import convert_from_bytes  # type: ignore
+    except Exception:  # pragma: no cover - if dependency missing we fall back later
+        return None
+    return convert_from_bytes
+
+
+@cache
+def _load_pymupdf() -> Optional[Any]:
+    """Importa PyMuPDF de forma diferida y recuerda el resultado."""
+
+    try:  # pragma: no cover - optional dependency
+        import fitz  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency not installed
+        return None
+    return fitz
+
+
+# Posiciones candidatas para cortar bloques: párrafos y, en su defecto, oraciones
+_PARAGRAPH_BREAK_RE = re.compile(r"(?=\n\n)")
+_SENTENCE_BREAK_RE = re.compile(r"(?=\. )")
+
+
+def _last_boundary(bounds: Sequence[int], start: int, end: int, width: int) -> int:
+    """Devuelve el último separador que cabe completo en ``(start, end]`` o -1."""
+
+    index = bisect_right(bounds, end - width) - 1
+    if index >= 0 and bounds[index] > start:
+        return bounds[index]
+    return -1
 
 
 class PDFTextExtractor:
@@ -24,19 +53,26 @@ class PDFTextExtractor:
     def __init__(self, max_chars_per_chunk: int = 50_000) -> None:
         self.max_chars_per_chunk = max_chars_per_chunk
 
-    def read_text(self, file_bytes: bytes) -> str:
-        """Extrae el texto embebido en el PDF usando PyPDF2."""
+    @staticmethod
+    def _extract_pages(reader: PdfReader) -> List[str]:
+        """Obtiene las palabras de todas las páginas tolerando errores puntuales."""
 
-        reader = PdfReader(io.BytesIO(file_bytes))
-        parts: List[str] = []
+        # Se normalizan los espacios página a página para no materializar el texto
+        # completo más de una vez
+        tokens: List[str] = []
         for page in reader.pages:
             try:
                 text = page.extract_text() or ""
             except Exception:
-                text = ""
-            parts.append(text)
-        joined = "\n".join(parts).strip()
-        return " ".join(joined.split())
+                continue
+            tokens.extend(text.split())
+        return tokens
+
+    def read_text(self, file_bytes: bytes) -> str:
+        """Extrae el texto embebido en el PDF usando PyPDF2."""
+
+        reader = PdfReader(io.BytesIO(file_bytes))
+        return " ".join(self._extract_pages(reader))
 
     @staticmethod
     def _guess_image_content_type(data: bytes, image_format: str) -> str:
@@ -64,6 +100,7 @@ class PDFTextExtractor:
     def _render_with_pdf2image(self, file_bytes: bytes) -> List[Tuple[bytes, str]]:
         """Renderiza páginas a imágenes usando pdf2image cuando está disponible."""
 
+        convert_from_bytes = _load_pdf2image()
         if convert_from_bytes is None:  # pragma: no cover - exercised when dependency exists
             return []
         try:
@@ -83,6 +120,7 @@ class PDFTextExtractor:
     def _render_with_pymupdf(self, file_bytes: bytes) -> List[Tuple[bytes, str]]:
         """Genera imágenes mediante PyMuPDF, útil para documentos escaneados."""
 
+        fitz = _load_pymupdf()
         if fitz is None:  # pragma: no cover - optional dependency
             return []
         try:
@@ -139,8 +177,10 @@ class PDFTextExtractor:
     def render_page_images(self, file_bytes: bytes) -> List[Tuple[bytes, str]]:
         """Aplica distintos motores para obtener imágenes representativas del PDF."""
 
-        # Se priorizan renderizadores de alta fidelidad y se cae a imágenes embebidas
-        for renderer in (self._render_with_pdf2image, self._render_with_pymupdf):
+        # Se priorizan renderizadores de alta fidelidad y se cae a imágenes embebidas.
+        # PyMuPDF trabaja en memoria; pdf2image vuelca el PDF a un archivo temporal
+        # antes de invocar pdftoppm, por lo que queda como segunda opción.
+        for renderer in (self._render_with_pymupdf, self._render_with_pdf2image):
             rendered = renderer(file_bytes)
             if rendered:
                 return rendered
@@ -151,13 +191,16 @@ class PDFTextExtractor:
 
         if len(text) <= self.max_chars_per_chunk:
             return [text]
+        # Los separadores se localizan una sola vez y luego se buscan por bisección
+        paragraphs = [match.start() for match in _PARAGRAPH_BREAK_RE.finditer(text)]
+        sentences = [match.start() for match in _SENTENCE_BREAK_RE.finditer(text)]
         chunks: list[str] = []
         start = 0
         while start < len(text):
             end = min(start + self.max_chars_per_chunk, len(text))
-            split_at = text.rfind("\n\n", start, end)
+            split_at = _last_boundary(paragraphs, start, end, 2)
             if split_at == -1:
-                split_at = text.rfind(". ", start, end)
+                split_at = _last_boundary(sentences, start, end, 2)
             if split_at == -1:
                 split_at = end
             chunk = text[start:split_at].strip()
@@ -3,8 +3,9 @@ from __future__ import annotations
 
 from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import Mapping, Sequence
 
 try:  # pragma: no cover - dependencias opcionales en tiempo de importación
     import joblib  # type: ignore
@@ -17,6 +18,28 @@ except ModuleNotFoundError:  # pragma: no cover - dependencias opcionales
     pd = None  # type: ignore[assignment]
 
 
+# Orden de columnas usado por ``train_random_forest``
+_DEFAULT_FEATURE_COLUMNS = (
+    "marca",
+    "tipo",
+    "clase",
+    "capacidad",
+    "combustible",
+    "ruedas",
+    "total",
+)
+
+
+@lru_cache(maxsize=1)
+def _load_model_file(path: str, mtime_ns: int, size: int):  # type: ignore[no-untyped-def]
+    """Deserializa el modelo una sola vez por versión del archivo en disco."""
+
+    # La fecha de modificación y el tamaño forman parte de la clave para que un
+    # reentrenamiento invalide la entrada sin necesidad de limpiar la caché. Con
+    # una sola entrada el modelo anterior se libera en cuanto se carga el nuevo.
+    return joblib.load(path)
+
+
 @dataclass(frozen=True)
 class PredictionResult:
     """Resultado estructurado producido por el clasificador Random Forest."""
@@ -28,14 +51,18 @@ class PredictionResult:
 class PredictionService:
     """Envoltorio ligero alrededor del modelo entrenado para realizar inferencias."""
 
+    # ``_state`` agrupa el modelo y su orden de columnas en una única tupla para
+    # que ``reload`` los reemplace a la vez mientras otros hilos predicen.
+    __slots__ = ("_model_path", "_state")
+
     def __init__(self, model_path: Path | str) -> None:
         self._model_path = Path(model_path)
         if not self._model_path.exists():
             raise FileNotFoundError(
                 f"No se encontró el archivo del modelo en {self._model_path!s}."
             )
-        self._model = self._load_model()
-        self._feature_columns = self._resolve_feature_columns()
+        model = self._load_model()
+        self._state = (model, self._resolve_feature_columns(model))
 
     def _load_model(self):  # type: ignore[no-untyped-def]
         """Carga el modelo desde disco validando la presencia de joblib."""
@@ -45,56 +72,84 @@ class PredictionService:
                 "joblib no está instalado. Instálalo para utilizar el servicio de predicciones."
             )
         try:
-            return joblib.load(self._model_path)
+            stat = self._model_path.stat()
+            return _load_model_file(
+                str(self._model_path.resolve()), stat.st_mtime_ns, stat.st_size
+            )
         except Exception as exc:  # pragma: no cover - defensive path
             raise RuntimeError("No se pudo cargar el modelo de predicción.") from exc
 
-    def _resolve_feature_columns(self) -> Sequence[str]:
+    @staticmethod
+    def _resolve_feature_columns(model) -> list[str]:  # type: ignore[no-untyped-def]
         """Obtiene el orden esperado de columnas a partir del modelo entrenado."""
 
-        candidates: Iterable[str] | None = getattr(
-            self._model, "feature_names_in_", None
-        )
-        if candidates is not None:
-            return list(candidates)
-        # Se vuelve al orden utilizado durante el entrenamiento cuando no hay metadatos
-        return ["marca", "tipo", "clase", "capacidad", "combustible", "ruedas", "total"]
+        candidates = getattr(model, "feature_names_in_", None)
+        if candidates is None:
+            # Se vuelve al orden utilizado durante el entrenamiento cuando no hay metadatos
+            return list(_DEFAULT_FEATURE_COLUMNS)
+        # ``feature_names_in_`` suele ser un ``ndarray``: ``tolist`` lo convierte
+        # en C y evita evaluar su verdad, que es ambigua
+        tolist = getattr(candidates, "tolist", None)
+        return tolist() if tolist is not None else list(candidates)
 
     def predict(self, features: Mapping[str, object]) -> PredictionResult:
         """Recibe un diccionario de atributos y devuelve la clase estimada."""
 
+        return self.predict_batch([features])[0]
+
+    def predict_batch(
+        self, features_list: Sequence[Mapping[str, object]]
+    ) -> list[PredictionResult]:
+        """Clasifica varias solicitudes con una sola llamada al modelo.
+
+        Las filas se reúnen en un único DataFrame para que ``predict`` y
+        ``predict_proba`` recorran el bosque una vez por lote y no por fila.
+        """
+
+        if pd is None:
+            raise RuntimeError(
+                "pandas no está instalado. Instálalo para utilizar el servicio de predicciones."
+            )
+        # Se lee el estado una sola vez: un ``reload`` concurrente no puede
+        # mezclar las columnas de un modelo con las predicciones de otro
+        model, columns = self._state
         try:
-            if pd is None:
-                raise RuntimeError(
-                    "pandas no está instalado. Instálalo para utilizar el servicio de predicciones."
-                )
-            ordered_row = {
-                column: features[column] for column in self._feature_columns
-            }
+            rows = [
+                [features[column] for column in columns] for features in features_list
+            ]
         except KeyError as exc:  # pragma: no cover - defensive path
             missing = exc.args[0]
             raise ValueError(
                 f"Falta el atributo requerido '{missing}' en la solicitud de predicción."
             ) from exc
-        frame = pd.DataFrame([ordered_row], columns=list(self._feature_columns))
-        predicted = self._model.predict(frame)[0]
+        if not rows:
+            return []
+        frame = pd.DataFrame(rows, columns=columns)
+        predicted = model.predict(frame)
         try:
-            probability_vector = self._model.predict_proba(frame)[0]
+            probability_matrix = model.predict_proba(frame)
         except AttributeError as exc:  # pragma: no cover - modelos sin predict_proba
             raise RuntimeError(
                 "El modelo configurado no expone probabilidades de clase."
             ) from exc
-        classes: Sequence[str] = getattr(self._model, "classes_", [])
-        probability_map: OrderedDict[str, float] = OrderedDict(
-            (str(label), float(prob)) for label, prob in zip(classes, probability_vector)
-        )
-        return PredictionResult(
-            predicted_class=str(predicted), probabilities=probability_map
-        )
+        classes = [str(label) for label in getattr(model, "classes_", [])]
+        return [
+            PredictionResult(
+                predicted_class=str(label),
+                probabilities=OrderedDict(
+                    (name, float(prob)) for name, prob in zip(classes, vector)
+                ),
+            )
+            for label, vector in zip(predicted, probability_matrix)
+        ]
 
     def reload(self) -> None:
-        """Recarga el modelo desde disco tras un reentrenamiento."""
+        """Recarga el modelo desde disco tras un reentrenamiento.
+
+        El modelo nuevo se carga por completo antes de publicarse con una única
+        asignación, por lo que las predicciones en curso usan uno u otro estado.
+        """
 
-        self._model = self._load_model()
-        self._feature_columns = self._resolve_feature_columns()
+        model = self._load_model()
+        self._state = (model, self._resolve_feature_columns(model))
 
@@ -5,7 +5,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
-from train.train import RandomForestTrainingResult, train_random_forest
+from train.train import (
+    ESTIMATOR_RANDOM_FOREST,
+    RandomForestTrainingResult,
+    train_random_forest,
+)
 
 
 @dataclass
@@ -14,8 +18,15 @@ class TrainingService:
 
     dataset_path: Path
     model_path: Path
+    estimator: str = ESTIMATOR_RANDOM_FOREST
+    use_gpu: bool = False
 
     def retrain_random_forest(self) -> RandomForestTrainingResult:
         """Ejecuta el pipeline de entrenamiento y devuelve sus métricas."""
 
-        return train_random_forest(self.dataset_path, self.model_path)
+        return train_random_forest(
+            self.dataset_path,
+            self.model_path,
+            estimator=self.estimator,
+            use_gpu=self.use_gpu,
+        )
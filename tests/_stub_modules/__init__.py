@@ -0,0 +1,59 @@
+"""Módulos sustitutos para ejecutar las pruebas sin dependencias externas.
+
+Cada submódulo define a nivel de módulo las clases que imitan a una dependencia
+y expone ``MODULES`` con los objetos :class:`types.ModuleType` ya construidos, de
+modo que las jerarquías de clases se crean una única vez por intérprete.
+"""
+from __future__ import annotations
+
+import importlib
+import types
+from typing import Dict, Tuple
+
+# (paquete real de primer nivel, submódulo de este paquete, módulos que sustituye)
+STUB_MANIFEST: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    (
+        "fastapi",
+        "fastapi",
+        (
+            "fastapi",
+            "fastapi.concurrency",
+            "fastapi.params",
+            "fastapi.status",
+            "fastapi.responses",
+            "fastapi.templating",
+            "fastapi.staticfiles",
+        ),
+    ),
+    ("pydantic", "pydantic", ("pydantic",)),
+    (
+        "azure",
+        "azure",
+        (
+            "azure",
+            "azure.ai",
+            "azure.ai.formrecognizer",
+            "azure.core",
+            "azure.core.credentials",
+        ),
+    ),
+    ("PyPDF2", "pypdf2", ("PyPDF2",)),
+    ("dotenv", "dotenv", ("dotenv",)),
+    ("torch", "torch", ("torch",)),
+    ("transformers", "transformers", ("transformers",)),
+    ("openai", "openai", ("openai",)),
+)
+
+
+def make_module(name: str, **attributes: object) -> types.ModuleType:
+    """Crea un módulo con los atributos indicados."""
+
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def load_stub_modules(submodule: str) -> Dict[str, types.ModuleType]:
+    """Importa el submódulo sustituto indicado y devuelve sus módulos."""
+
+    return importlib.import_module(f"{__name__}.{submodule}").MODULES
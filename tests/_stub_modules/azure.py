@@ -0,0 +1,35 @@
+"""Sustituto mínimo del SDK de Azure Form Recognizer para las pruebas."""
+from __future__ import annotations
+
+from . import make_module
+
+
+class DocumentAnalysisClient:  # pragma: no cover - no se usa directamente
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+    def begin_analyze_document(self, *args, **kwargs):
+        raise RuntimeError("Azure SDK stub in use")
+
+
+class AzureKeyCredential:  # pragma: no cover - no se usa directamente
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+
+formrecognizer = make_module(
+    "azure.ai.formrecognizer", DocumentAnalysisClient=DocumentAnalysisClient
+)
+ai = make_module("azure.ai", formrecognizer=formrecognizer)
+credentials = make_module(
+    "azure.core.credentials", AzureKeyCredential=AzureKeyCredential
+)
+core = make_module("azure.core", credentials=credentials)
+
+MODULES = {
+    "azure": make_module("azure", ai=ai, core=core),
+    "azure.ai": ai,
+    "azure.ai.formrecognizer": formrecognizer,
+    "azure.core": core,
+    "azure.core.credentials": credentials,
+}
@@ -0,0 +1,11 @@
+"""Sustituto mínimo de python-dotenv para las pruebas."""
+from __future__ import annotations
+
+from . import make_module
+
+
+def load_dotenv(*args, **kwargs) -> None:  # pragma: no cover - función mínima
+    return None
+
+
+MODULES = {"dotenv": make_module("dotenv", load_dotenv=load_dotenv)}
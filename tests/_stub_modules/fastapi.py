@@ -0,0 +1,157 @@
+"""Sustituto mínimo de FastAPI para las pruebas."""
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+from . import make_module
+
+
+class HTTPException(Exception):
+    """Excepción ligera que imita a :class:`fastapi.HTTPException`."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class Request:  # pragma: no cover - solo usado por tipado
+    """Objeto mínimo con estado mutable para tests."""
+
+    def __init__(self) -> None:
+        self.app = SimpleNamespace(state=SimpleNamespace())
+
+
+class UploadFile:  # pragma: no cover - no se utiliza directamente en los tests
+    def __init__(
+        self,
+        filename: str | None = None,
+        content_type: str | None = None,
+        data: bytes = b"",
+    ) -> None:
+        self.filename = filename
+        self.content_type = content_type
+        self._data = data
+
+    async def read(self) -> bytes:
+        return self._data
+
+
+class APIRouter:  # pragma: no cover - decoración sin efectos
+    def __init__(self, *args, **kwargs) -> None:
+        self.routes = []
+
+    def post(self, *args, **kwargs):
+        def decorator(func):
+            self.routes.append(("POST", args, kwargs, func))
+            return func
+
+        return decorator
+
+    def get(self, *args, **kwargs):
+        def decorator(func):
+            self.routes.append(("GET", args, kwargs, func))
+            return func
+
+        return decorator
+
+
+class FastAPI:  # pragma: no cover - utilizado solo para tipado
+    def __init__(self, *args, **kwargs) -> None:
+        self.state = SimpleNamespace()
+
+    def include_router(self, *args, **kwargs) -> None:
+        return None
+
+    def mount(self, *args, **kwargs) -> None:
+        return None
+
+
+def Depends(dependency):  # pragma: no cover - no utilizado en ejecución
+    return dependency
+
+
+def File(default=..., **kwargs):  # pragma: no cover - valores por defecto
+    return default
+
+
+def Query(default=..., **kwargs):  # pragma: no cover - valores por defecto
+    return default
+
+
+class Param:  # pragma: no cover - solo para comprobaciones ``isinstance``
+    """Marcador equivalente a :class:`fastapi.params.Param`."""
+
+    def __init__(self, default=..., **kwargs) -> None:
+        self.default = default
+
+
+async def run_in_threadpool(func, *args, **kwargs):  # pragma: no cover - ejecución directa
+    return func(*args, **kwargs)
+
+
+class HTMLResponse:  # pragma: no cover - solo para tipado
+    def __init__(self, content: str, status_code: int = 200) -> None:
+        self.body = content
+        self.status_code = status_code
+
+
+class JSONResponse:  # pragma: no cover - solo para tipado
+    def __init__(self, content: object, status_code: int = 200) -> None:
+        self.body = self.render(content)
+        self.status_code = status_code
+
+    def render(self, content: object) -> bytes:
+        return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+class Jinja2Templates:  # pragma: no cover - utilizado solo por tipado
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def TemplateResponse(self, name: str, context: dict) -> dict:
+        return {"template": name, "context": context}
+
+
+class StaticFiles:  # pragma: no cover - solo informativo
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+
+concurrency = make_module("fastapi.concurrency", run_in_threadpool=run_in_threadpool)
+params = make_module("fastapi.params", Param=Param)
+status = make_module(
+    "fastapi.status",
+    HTTP_500_INTERNAL_SERVER_ERROR=500,
+    HTTP_400_BAD_REQUEST=400,
+)
+responses = make_module(
+    "fastapi.responses", HTMLResponse=HTMLResponse, JSONResponse=JSONResponse
+)
+templating = make_module("fastapi.templating", Jinja2Templates=Jinja2Templates)
+staticfiles = make_module("fastapi.staticfiles", StaticFiles=StaticFiles)
+fastapi = make_module(
+    "fastapi",
+    FastAPI=FastAPI,
+    APIRouter=APIRouter,
+    Depends=Depends,
+    File=File,
+    Query=Query,
+    HTTPException=HTTPException,
+    Request=Request,
+    UploadFile=UploadFile,
+    concurrency=concurrency,
+    params=params,
+    status=status,
+)
+
+MODULES = {
+    "fastapi": fastapi,
+    "fastapi.concurrency": concurrency,
+    "fastapi.params": params,
+    "fastapi.status": status,
+    "fastapi.responses": responses,
+    "fastapi.templating": templating,
+    "fastapi.staticfiles": staticfiles,
+}
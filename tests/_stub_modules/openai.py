@@ -0,0 +1,26 @@
+"""Sustituto mínimo del cliente de OpenAI para las pruebas."""
+from __future__ import annotations
+
+from . import make_module
+
+
+class _ChatCompletions:  # pragma: no cover - interfaz mínima
+    def create(self, *args, **kwargs):
+        raise RuntimeError("OpenAI stub invoked")
+
+
+class _Chat:
+    def __init__(self) -> None:
+        self.completions = _ChatCompletions()
+
+
+class OpenAI:  # pragma: no cover - sustituto liviano
+    def __init__(self, api_key: str | None = None) -> None:
+        self.api_key = api_key
+        self.chat = _Chat()
+
+    def close(self) -> None:
+        pass
+
+
+MODULES = {"openai": make_module("openai", OpenAI=OpenAI)}
@@ -0,0 +1,131 @@
+"""Sustituto mínimo de Pydantic para las pruebas."""
+from __future__ import annotations
+
+import json
+import typing
+
+from . import make_module
+
+
+class FieldInfo:
+    """Contenedor mínimo de metadatos para un campo."""
+
+    def __init__(self, default=..., **metadata) -> None:
+        self.default = default
+        self.metadata = metadata
+
+
+def Field(default=..., **metadata):
+    return FieldInfo(default, **metadata)
+
+
+def field_validator(*fields, mode: str = "after"):
+    def decorator(func):
+        # Como en Pydantic v2 el validador puede llegar envuelto en ``classmethod``
+        target = func.__func__ if isinstance(func, classmethod) else func
+        target.__validator_fields__ = fields
+        target.__validator_pre__ = mode == "before"
+        return func
+
+    return decorator
+
+
+_MISSING = object()
+
+
+class BaseModelMeta(type):
+    def __new__(mcls, name, bases, namespace):
+        validators = {}  # field -> list[(pre, func)]
+        for base in bases:
+            for field, funcs in getattr(base, "__validators__", {}).items():
+                validators.setdefault(field, []).extend(funcs)
+        for attr_name, value in list(namespace.items()):
+            if isinstance(value, classmethod):
+                value = value.__func__
+            fields = getattr(value, "__validator_fields__", None)
+            if fields is None:
+                continue
+            pre = getattr(value, "__validator_pre__", False)
+            for field in fields:
+                validators.setdefault(field, []).append((pre, value))
+        namespace["__validators__"] = validators
+        annotations = namespace.get("__annotations__", {})
+        fields = [field for field in annotations if not field.startswith("__")]
+        # Plan de inicialización precalculado: (campo, defecto, validadores) por
+        # campo, con los validadores ``pre`` ya ordenados antes que el resto. Los
+        # valores por defecto salen del cuerpo de la clase para no chocar con los
+        # ``__slots__`` de los campos.
+        plan = []
+        for field in fields:
+            field_info = namespace.pop(field, FieldInfo(...))
+            if isinstance(field_info, FieldInfo):
+                default = field_info.default
+            else:
+                default = field_info
+            funcs = validators.get(field, ())
+            plan.append(
+                (
+                    field,
+                    _MISSING if default is ... else default,
+                    tuple(func for pre, func in funcs if pre)
+                    + tuple(func for pre, func in funcs if not pre),
+                )
+            )
+        if annotations or not bases:
+            namespace["__init_plan__"] = tuple(plan)
+        namespace.setdefault("__slots__", tuple(fields))
+        return super().__new__(mcls, name, bases, namespace)
+
+
+class BaseModel(metaclass=BaseModelMeta):
+    __validators__: dict[str, list[tuple[bool, callable]]] = {}
+
+    def __init__(self, **data):
+        cls = self.__class__
+        pop = data.pop
+        for field, default, field_validators in cls.__init_plan__:
+            value = pop(field, default)
+            if value is _MISSING:
+                raise ValueError(f"El campo '{field}' es obligatorio")
+            for func in field_validators:
+                value = func(cls, value)
+            setattr(self, field, value)
+        # Ignorar campos extra, imitando el comportamiento por defecto de Pydantic
+
+    def model_dump(self) -> dict:
+        return {field: getattr(self, field) for field, _, _ in self.__init_plan__}
+
+
+class ValidationError(ValueError):
+    """Error de validación equivalente al expuesto por Pydantic."""
+
+
+class TypeAdapter:
+    """Validador mínimo que solo comprueba el tipo contenedor esperado."""
+
+    def __init__(self, type_) -> None:
+        self._type = typing.get_origin(type_) or type_
+
+    def validate_python(self, value):
+        if not isinstance(value, self._type):
+            raise ValidationError(f"Se esperaba {self._type.__name__}")
+        return value
+
+    def validate_json(self, data):
+        try:
+            value = json.loads(data)
+        except (TypeError, ValueError) as exc:
+            raise ValidationError(str(exc)) from exc
+        return self.validate_python(value)
+
+
+MODULES = {
+    "pydantic": make_module(
+        "pydantic",
+        BaseModel=BaseModel,
+        TypeAdapter=TypeAdapter,
+        ValidationError=ValidationError,
+        Field=Field,
+        field_validator=field_validator,
+    ),
+}
@@ -0,0 +1,19 @@
+"""Sustituto mínimo de PyPDF2 para las pruebas."""
+from __future__ import annotations
+
+from . import make_module
+
+
+class _DummyPage:  # pragma: no cover - no se usa en las pruebas
+    def extract_text(self) -> str:
+        return ""
+
+
+class PdfReader:  # pragma: no cover - evita errores de importación
+    def __init__(self, *args, **kwargs) -> None:
+        self.pages = []
+
+
+MODULES = {
+    "PyPDF2": make_module("PyPDF2", PdfReader=PdfReader, PageObject=_DummyPage),
+}
@@ -0,0 +1,21 @@
+"""Sustituto mínimo de PyTorch para las pruebas."""
+from __future__ import annotations
+
+from . import make_module
+
+
+class _CudaModule:  # pragma: no cover - no se utiliza directamente
+    @staticmethod
+    def is_available() -> bool:
+        return False
+
+
+class Tensor:  # pragma: no cover - solo para comprobaciones ``isinstance``
+    """Marcador que SciPy consulta al detectar arrays de PyTorch."""
+
+
+MODULES = {
+    "torch": make_module(
+        "torch", cuda=_CudaModule(), bfloat16="bfloat16", Tensor=Tensor
+    ),
+}
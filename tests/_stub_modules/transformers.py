@@ -0,0 +1,33 @@
+"""Sustituto mínimo de Hugging Face Transformers para las pruebas."""
+from __future__ import annotations
+
+from . import make_module
+
+
+class _DummyObject:  # pragma: no cover - utilizado solo para tipado
+    def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
+
+
+class _AutoBase:
+    @staticmethod
+    def from_pretrained(*args, **kwargs):
+        return _DummyObject(**kwargs)
+
+
+def pipeline(*args, **kwargs):  # pragma: no cover - evita dependencias reales
+    def _runner(*_args, **_kwargs):
+        raise RuntimeError("transformers pipeline stub invoked")
+
+    return _runner
+
+
+MODULES = {
+    "transformers": make_module(
+        "transformers",
+        AutoConfig=_AutoBase,
+        AutoTokenizer=_AutoBase,
+        AutoModelForCausalLM=_AutoBase,
+        pipeline=pipeline,
+    ),
+}
@@ -0,0 +1,106 @@
+"""Dobles de prueba y fixtures compartidos para el servicio de extracción."""
+from __future__ import annotations
+
+import pytest
+
+from app.config import Config
+from app.services.extraction_service import ExtractionResult, ExtractionService
+
+
+class _StubPdfExtractor:
+    """Simula un lector de PDF permitiendo controlar su salida en las pruebas."""
+
+    def __init__(self) -> None:
+        self.text = "texto pdf"
+        self.images = [(b"page-1", "image/png")]
+        self.render_calls = 0
+        self.read_calls = 0
+
+    def read_text(self, data: bytes) -> str:
+        self.read_calls += 1
+        return self.text
+
+    def render_page_images(self, data: bytes):
+        self.render_calls += 1
+        return list(self.images)
+
+
+class _StubAzureOCRService:
+    """OCR mínimo que devuelve siempre el mismo texto."""
+
+    def __init__(self) -> None:
+        self.text = "FACTURA 001-001-000123456 TOTAL 10.00"
+        self.calls: list[tuple[bytes, str | None]] = []
+
+    def extract_text(self, data: bytes, content_type: str | None = None) -> str:
+        self.calls.append((data, content_type))
+        return self.text
+
+
+class _InstrumentedExtractionService(ExtractionService):
+    """Extensión del servicio real que captura invocaciones para validarlas."""
+
+    def __init__(
+        self,
+        config: Config,
+        pdf: _StubPdfExtractor,
+        ocr: _StubAzureOCRService,
+    ) -> None:
+        super().__init__(config)
+        self._pdf = pdf
+        self._ocr_stub = ocr
+        self.text_invocations: list[dict[str, object]] = []
+        self.vision_invocations: list[list[tuple[bytes, str | None]]] = []
+        self.ocr_invocations = 0
+
+    def extract_from_text(self, text: str, **kwargs) -> ExtractionResult:  # type: ignore[override]
+        payload = {"text": text, **kwargs}
+        self.text_invocations.append(payload)
+        return ExtractionResult(
+            fields={"ok": True},
+            raw_text=text,
+            text_origin=kwargs.get("text_origin", "file"),
+        )
+
+    def _resolve_ocr_service(self, *args, **kwargs):  # type: ignore[override]
+        return self._ocr_stub
+
+    def _encode_vision_images(self, images, limit=3):  # type: ignore[override]
+        collected = list(images)
+        self.vision_invocations.append(collected)
+        if not collected:
+            return None
+        encoded = []
+        for index, (_, media_type) in enumerate(collected):
+            normalized = (media_type or "image/png").lower()
+            encoded.append({"media_type": normalized, "data": f"encoded-{index}"})
+        return encoded
+
+    def _extract_text_from_file(self, *args, **kwargs):  # type: ignore[override]
+        self.ocr_invocations += 1
+        return self._ocr_stub.text
+
+
+@pytest.fixture
+def pdf_stub() -> _StubPdfExtractor:
+    """Lector de PDF simulado cuyo texto e imágenes ajusta cada prueba."""
+
+    return _StubPdfExtractor()
+
+
+@pytest.fixture
+def ocr_stub() -> _StubAzureOCRService:
+    """Servicio OCR simulado que registra las llamadas recibidas."""
+
+    return _StubAzureOCRService()
+
+
+@pytest.fixture
+def extraction_service(
+    app_config: Config,
+    pdf_stub: _StubPdfExtractor,
+    ocr_stub: _StubAzureOCRService,
+) -> _InstrumentedExtractionService:
+    """Servicio instrumentado que compone los stubs inyectados por fixture."""
+
+    return _InstrumentedExtractionService(app_config, pdf_stub, ocr_stub)
@@ -2,14 +2,28 @@
 from __future__ import annotations
 
 import asyncio
-from collections import OrderedDict
+import base64
+import io
+import json
 
 import pytest
-from fastapi import HTTPException
 
+from app import responses
 from app.config import Config
-from app.routes.extract import TextExtractionRequest, extract_from_file_endpoint, extract_from_text_endpoint
-from app.routes.predictions import PredictionRequest, create_prediction
+from app.routes.extract import (
+    TextExtractionRequest,
+    _get_service,
+    extract_from_file_endpoint,
+    extract_from_image_endpoint,
+    extract_from_text_endpoint,
+)
+from app.routes.predictions import (
+    BatchPredictionRequest,
+    PredictionRequest,
+    _get_prediction_service,
+    create_batch_prediction,
+    create_prediction,
+)
 from app.services.extraction_service import ExtractionResult, ExtractionService
 from app.services.prediction_service import PredictionResult
 
@@ -19,20 +33,19 @@ class _StubPredictionService:
 
     def __init__(self) -> None:
         self.last_features: dict[str, object] | None = None
+        self.batches: list[list[dict[str, object]]] = []
 
     def predict(self, features: dict[str, object]) -> PredictionResult:
         self.last_features = dict(features)
         return PredictionResult(
             predicted_class="COMERCIAL",
-            probabilities=OrderedDict(
-                [
-                    ("COMERCIAL", 0.72),
-                    ("FAMILIAR", 0.20),
-                    ("DEPORTIVO", 0.08),
-                ]
-            ),
+            probabilities={"COMERCIAL": 0.72, "FAMILIAR": 0.20, "DEPORTIVO": 0.08},
         )
 
+    def predict_batch(self, features_list: list[dict[str, object]]) -> list[PredictionResult]:
+        self.batches.append([dict(features) for features in features_list])
+        return [self.predict(features) for features in features_list]
+
 
 class _FailingPredictionService:
     """Simula una falla inesperada al calcular la predicción."""
@@ -88,86 +101,210 @@ class _StubExtractionService:
         )
 
 
-class _DummyUploadFile:
-    """Equivalente mínimo de :class:`fastapi.UploadFile` para las pruebas."""
+async def test_create_prediction_endpoint_returns_payload(
+    async_client, override_dependency
+):
+    """Debe entregar la clase predicha y las probabilidades calculadas."""
 
-    def __init__(self, filename: str, content_type: str, data: bytes) -> None:
-        self.filename = filename
-        self.content_type = content_type
-        self._data = data
+    service = override_dependency(_get_prediction_service, _StubPredictionService())
+
+    response = await async_client.post(
+        "/api/v1/predictions",
+        json={
+            "marca": " Ford ",
+            "tipo": "SUV",
+            "clase": "Camioneta",
+            "capacidad": 5,
+            "combustible": "gasolina",
+            "ruedas": 4,
+            "total": "23.500,80",
+        },
+    )
 
-    async def read(self) -> bytes:
-        return self._data
+    assert response.status_code == 200
+    body = response.json()
+    assert body["categoria_predicha"] == "COMERCIAL"
+    assert [p["clase"] for p in body["probabilidades"]] == [
+        "COMERCIAL",
+        "FAMILIAR",
+        "DEPORTIVO",
+    ]
+    assert service.last_features == {
+        "marca": "FORD",
+        "tipo": "SUV",
+        "clase": "CAMIONETA",
+        "capacidad": 5,
+        "combustible": "GASOLINA",
+        "ruedas": 4,
+        "total": 23500.8,
+    }
+    assert body["valores_entrada"] == service.last_features
+
+
+async def test_create_batch_prediction_endpoint_returns_results_in_order(
+    async_client, override_dependency
+):
+    """El lote completo se envía al servicio en una sola llamada."""
+
+    service = override_dependency(_get_prediction_service, _StubPredictionService())
+    solicitud = {
+        "marca": "Kia",
+        "tipo": "Sedan",
+        "clase": "Automovil",
+        "capacidad": 5,
+        "combustible": "Gasolina",
+        "ruedas": 4,
+    }
+
+    response = await async_client.post(
+        "/api/v1/predictions/batch",
+        json={
+            "solicitudes": [
+                {**solicitud, "total": "17 900,75"},
+                {**solicitud, "marca": "Ford", "total": 21000},
+            ]
+        },
+    )
 
+    assert response.status_code == 200
+    predicciones = response.json()["predicciones"]
+    assert len(service.batches) == 1
+    assert [features["total"] for features in service.batches[0]] == [17900.75, 21000.0]
+    assert [p["valores_entrada"]["marca"] for p in predicciones] == ["KIA", "FORD"]
+    assert all(p["categoria_predicha"] == "COMERCIAL" for p in predicciones)
 
-class _StubPdfExtractor:
-    """Simula un lector de PDF permitiendo controlar su salida en las pruebas."""
 
-    def __init__(self) -> None:
-        self.text = "texto pdf"
-        self.images = [(b"page-1", "image/png")]
-        self.render_calls = 0
+async def test_create_prediction_endpoint_handles_service_error(
+    async_client, override_dependency
+):
+    """Convierte errores inesperados del servicio en respuestas HTTP 500."""
 
-    def read_text(self, data: bytes) -> str:
-        return self.text
+    override_dependency(_get_prediction_service, _FailingPredictionService())
+
+    response = await async_client.post(
+        "/api/v1/predictions",
+        json={
+            "marca": "Ford",
+            "tipo": "Sedan",
+            "clase": "Automovil",
+            "capacidad": 4,
+            "combustible": "Gasolina",
+            "ruedas": 4,
+            "total": 18000,
+        },
+    )
 
-    def render_page_images(self, data: bytes):
-        self.render_calls += 1
-        return list(self.images)
+    assert response.status_code == 500
+    assert "No se pudo" in response.json()["detail"]
 
 
-class _StubAzureOCRService:
-    """OCR mínimo que devuelve siempre el mismo texto."""
+async def test_extract_from_text_endpoint_trims_and_returns_payload(
+    async_client, override_dependency
+):
+    """Normaliza el texto de entrada antes de delegar en el servicio."""
 
-    def __init__(self) -> None:
-        self.text = "texto ocr"
-        self.calls: list[tuple[bytes, str | None]] = []
+    service = override_dependency(_get_service, _StubExtractionService())
 
-    def extract_text(self, data: bytes, content_type: str | None = None) -> str:
-        self.calls.append((data, content_type))
-        return self.text
+    response = await async_client.post(
+        "/api/v1/extract/text",
+        json={"text": "  Total: 10.000  ", "llm_provider": "api"},
+    )
 
+    assert response.status_code == 200
+    assert response.json()["fields"]["total"] == 15000.50
+    assert service.text_calls[0]["text"] == "Total: 10.000"
 
-class _InstrumentedExtractionService(ExtractionService):
-    """Extensión del servicio real que captura invocaciones para validarlas."""
 
-    def __init__(self) -> None:
-        super().__init__(Config())
-        self._pdf = _StubPdfExtractor()
-        self._ocr_stub = _StubAzureOCRService()
-        self.text_invocations: list[dict[str, object]] = []
-        self.vision_invocations: list[list[tuple[bytes, str | None]]] = []
-        self.ocr_invocations = 0
-
-    def extract_from_text(self, text: str, **kwargs) -> ExtractionResult:  # type: ignore[override]
-        payload = {"text": text, **kwargs}
-        self.text_invocations.append(payload)
-        return ExtractionResult(
-            fields={"ok": True},
-            raw_text=text,
-            text_origin=kwargs.get("text_origin", "file"),
-        )
+async def test_extract_from_file_endpoint_rejects_images(
+    async_client, override_dependency
+):
+    """El endpoint principal de archivos no debe aceptar imágenes directas."""
+
+    override_dependency(_get_service, _StubExtractionService())
+
+    response = await async_client.post(
+        "/api/v1/extract/file",
+        files={"file": ("comprobante.png", b"data", "image/png")},
+    )
+
+    assert response.status_code == 400
+
+
+async def test_extract_from_file_endpoint_returns_payload(
+    async_client, override_dependency
+):
+    """Procesa archivos válidos y retorna el resultado estructurado."""
+
+    override_dependency(_get_service, _StubExtractionService())
+
+    response = await async_client.post(
+        "/api/v1/extract/file",
+        files={"file": ("factura.pdf", b"pdf-bytes", "application/pdf")},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["fields"]["nit"] == "987654321"
+
+
+async def test_extract_from_file_endpoint_forwards_use_vision(
+    async_client, override_dependency
+):
+    """Debe propagar el indicador de visión cuando se solicite."""
+
+    service = override_dependency(_get_service, _StubExtractionService())
+
+    response = await async_client.post(
+        "/api/v1/extract/file",
+        params={"use_vision": "true"},
+        files={"file": ("factura.pdf", b"pdf-bytes", "application/pdf")},
+    )
 
-    def _resolve_ocr_service(self, *args, **kwargs):  # type: ignore[override]
-        return self._ocr_stub
+    assert response.status_code == 200
+    assert service.file_calls[0]["use_vision"] is True
+    assert service.file_calls[0]["filename"] == "factura.pdf"
+    assert service.file_calls[0]["size"] == len(b"pdf-bytes")
+
+
+async def test_extract_from_image_endpoint_respects_use_ocr_flag(
+    async_client, override_dependency
+):
+    """La API de imágenes debe permitir desactivar el OCR cuando se indique."""
+
+    service = override_dependency(_get_service, _StubExtractionService())
+
+    response = await async_client.post(
+        "/api/v1/extract/image",
+        params={"use_vision": "true", "use_ocr": "false"},
+        files={"image": ("foto.png", b"pixel", "image/png")},
+    )
+
+    assert response.status_code == 200
+    assert service.image_calls[0]["use_vision"] is True
+    assert service.image_calls[0]["use_ocr"] is False
+    assert service.image_calls[0]["filename"] == "foto.png"
+    assert service.image_calls[0]["size"] == len(b"pixel")
+
+
+class _DummyUploadFile:
+    """Equivalente mínimo de :class:`fastapi.UploadFile` para las pruebas."""
+
+    def __init__(self, filename: str, content_type: str, data: bytes) -> None:
+        self.filename = filename
+        self.content_type = content_type
+        self._data = data
 
-    def _encode_vision_images(self, images, limit=3):  # type: ignore[override]
-        collected = list(images)
-        self.vision_invocations.append(collected)
-        if not collected:
-            return None
-        encoded = []
-        for index, (_, media_type) in enumerate(collected):
-            normalized = (media_type or "image/png").lower()
-            encoded.append({"media_type": normalized, "data": f"encoded-{index}"})
-        return encoded
+    def read(self) -> "asyncio.Future[bytes]":
+        # Un futuro ya resuelto se consume con ``await`` sin ceder el control al loop
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(self._data)
+        return future
 
-    def _extract_text_from_file(self, *args, **kwargs):  # type: ignore[override]
-        self.ocr_invocations += 1
-        return self._ocr_stub.text
 
+# Las rutas también se invocan directamente: así se ejercitan con los módulos
+# sustitutos de ``tests/_stub_modules`` cuando FastAPI o httpx no están instalados.
 
-def test_create_prediction_endpoint_returns_payload():
+
+async def test_create_prediction_route_returns_payload():
     """Debe entregar la clase predicha y las probabilidades calculadas."""
 
     service = _StubPredictionService()
@@ -181,15 +318,17 @@ def test_create_prediction_endpoint_returns_payload():
         total="23.500,80",
     )
 
-    response = asyncio.run(create_prediction(payload, service=service))
+    response = await create_prediction(payload, service=service)
 
     assert response.categoria_predicha == "COMERCIAL"
     assert [p.clase for p in response.probabilidades] == ["COMERCIAL", "FAMILIAR", "DEPORTIVO"]
     assert service.last_features == payload.to_features()
 
 
-def test_create_prediction_endpoint_handles_service_error():
-    """Convierte errores inesperados del servicio en respuestas HTTP 500."""
+async def test_create_prediction_route_handles_service_error():
+    """Convierte errores inesperados del servicio en ``HTTPException`` 500."""
+
+    from fastapi import HTTPException
 
     payload = PredictionRequest(
         marca="Ford",
@@ -202,76 +341,87 @@ def test_create_prediction_endpoint_handles_service_error():
     )
 
     with pytest.raises(HTTPException) as excinfo:
-        asyncio.run(create_prediction(payload, service=_FailingPredictionService()))
+        await create_prediction(payload, service=_FailingPredictionService())
 
     assert excinfo.value.status_code == 500
-    assert "No se pudo" in str(excinfo.value)
+    assert "No se pudo" in str(excinfo.value.detail)
+
+
+async def test_create_batch_prediction_route_preserves_order():
+    """El lote se entrega completo al servicio y se responde en el mismo orden."""
+
+    service = _StubPredictionService()
+    solicitudes = [
+        PredictionRequest(
+            marca=marca,
+            tipo="Sedan",
+            clase="Automovil",
+            capacidad=5,
+            combustible="Gasolina",
+            ruedas=4,
+            total=18000,
+        )
+        for marca in ("Kia", "Ford")
+    ]
+
+    response = await create_batch_prediction(
+        BatchPredictionRequest(solicitudes=solicitudes), service=service
+    )
+
+    assert len(service.batches) == 1
+    assert [p.valores_entrada["marca"] for p in response.predicciones] == ["KIA", "FORD"]
 
 
-def test_extract_from_text_endpoint_trims_and_returns_payload():
+async def test_extract_from_text_route_trims_and_returns_payload():
     """Normaliza el texto de entrada antes de delegar en el servicio."""
 
     service = _StubExtractionService()
     payload = TextExtractionRequest(text="  Total: 10.000  ", llm_provider="api")
 
-    result = asyncio.run(extract_from_text_endpoint(payload, service=service))
+    result = await extract_from_text_endpoint(payload, service=service)
 
     assert result["fields"]["total"] == 15000.50
     assert service.text_calls[0]["text"] == "Total: 10.000"
 
 
-def test_extract_from_file_endpoint_rejects_images():
-    """El endpoint principal de archivos no debe aceptar imágenes directas."""
+async def test_extract_from_file_route_rejects_images():
+    """La ruta principal de archivos no debe aceptar imágenes directas."""
+
+    from fastapi import HTTPException
 
     upload = _DummyUploadFile("comprobante.png", "image/png", b"data")
 
     with pytest.raises(HTTPException) as excinfo:
-        asyncio.run(
-            extract_from_file_endpoint(upload, service=_StubExtractionService())
-        )
+        await extract_from_file_endpoint(upload, service=_StubExtractionService())
 
     assert excinfo.value.status_code == 400
 
 
-def test_extract_from_file_endpoint_returns_payload():
-    """Procesa archivos válidos y retorna el resultado estructurado."""
-
-    service = _StubExtractionService()
-    upload = _DummyUploadFile("factura.pdf", "application/pdf", b"pdf-bytes")
-
-    result = asyncio.run(extract_from_file_endpoint(upload, service=service))
-
-    assert result["fields"]["nit"] == "987654321"
-
-
-def test_extract_from_file_endpoint_forwards_use_vision():
+async def test_extract_from_file_route_forwards_use_vision():
     """Debe propagar el indicador de visión cuando se solicite."""
 
     service = _StubExtractionService()
     upload = _DummyUploadFile("factura.pdf", "application/pdf", b"pdf-bytes")
 
-    asyncio.run(
-        extract_from_file_endpoint(upload, use_vision=True, service=service)
-    )
+    result = await extract_from_file_endpoint(upload, use_vision=True, service=service)
 
+    assert result["fields"]["nit"] == "987654321"
     assert service.file_calls[0]["use_vision"] is True
     assert service.file_calls[0]["filename"] == "factura.pdf"
     assert service.file_calls[0]["size"] == len(b"pdf-bytes")
 
 
-def test_extract_from_image_endpoint_respects_use_ocr_flag():
-    """La API de imágenes debe permitir desactivar el OCR cuando se indique."""
+async def test_extract_from_image_route_respects_use_ocr_flag():
+    """La ruta de imágenes debe permitir desactivar el OCR cuando se indique."""
 
     service = _StubExtractionService()
     upload = _DummyUploadFile("foto.png", "image/png", b"pixel")
 
-    asyncio.run(
-        extract_from_image_endpoint(
-            upload,
-            use_vision=True,
-            use_ocr=False,
-            service=service,
-        )
+    await extract_from_image_endpoint(
+        upload,
+        use_vision=True,
+        use_ocr=False,
+        service=service,
     )
 
     assert service.image_calls[0]["use_vision"] is True
@@ -280,44 +430,48 @@ def test_extract_from_image_endpoint_respects_use_ocr_flag():
     assert service.image_calls[0]["size"] == len(b"pixel")
 
 
-def test_extraction_service_uses_direct_text_without_vision():
+def test_extraction_service_uses_direct_text_without_vision(
+    extraction_service,
+    pdf_stub,
+):
     """Cuando Visión está apagado, solo debe enviarse el texto disponible."""
 
-    service = _InstrumentedExtractionService()
-    service._pdf.text = "contenido directo"
+    pdf_stub.text = "contenido directo"
 
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "factura.pdf", b"%PDF", "application/pdf", use_vision=False
     )
 
-    invocation = service.text_invocations[-1]
+    invocation = extraction_service.text_invocations[-1]
     assert invocation["text"] == "contenido directo"
     assert invocation["vision_images"] is None
     assert invocation["text_origin"] == "file"
-    assert service._pdf.render_calls == 0
+    assert pdf_stub.render_calls == 0
     assert result.raw_text == "contenido directo"
     assert result.text_origin == "file"
 
 
-def test_extraction_service_adds_images_when_vision_enabled():
+def test_extraction_service_adds_images_when_vision_enabled(
+    extraction_service,
+    pdf_stub,
+):
     """Si Visión está activo, debe adjuntar capturas además del texto."""
 
-    service = _InstrumentedExtractionService()
-    service._pdf.text = "contenido digital"
-    service._pdf.images = [(b"page-1", "image/png"), (b"page-2", "image/jpeg")]
+    pdf_stub.text = "contenido digital"
+    pdf_stub.images = [(b"page-1", "image/png"), (b"page-2", "image/jpeg")]
 
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "factura.pdf", b"%PDF", "application/pdf", use_vision=True
     )
 
-    invocation = service.text_invocations[-1]
+    invocation = extraction_service.text_invocations[-1]
     assert invocation["text"] == "contenido digital"
     assert invocation["vision_images"] == [
         {"media_type": "image/png", "data": "encoded-0"},
         {"media_type": "image/jpeg", "data": "encoded-1"},
     ]
-    assert service._pdf.render_calls == 1
-    assert service.vision_invocations[-1] == [
+    assert pdf_stub.render_calls == 1
+    assert extraction_service.vision_invocations[-1] == [
         (b"page-1", "image/png"),
         (b"page-2", "image/jpeg"),
     ]
@@ -325,12 +479,10 @@ def test_extraction_service_adds_images_when_vision_enabled():
     assert result.text_origin == "file"
 
 
-def test_extraction_service_never_enables_vision_for_xml():
+def test_extraction_service_never_enables_vision_for_xml(extraction_service, pdf_stub):
     """Archivos XML solo deben enviar el contenido plano al modelo."""
 
-    service = _InstrumentedExtractionService()
-
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "factura.xml",
         b"<factura>contenido</factura>",
         "application/xml",
@@ -338,21 +490,19 @@ def test_extraction_service_never_enables_vision_for_xml():
         use_vision=True,
     )
 
-    invocation = service.text_invocations[-1]
+    invocation = extraction_service.text_invocations[-1]
     assert invocation["text"] == "<factura>contenido</factura>"
     assert invocation["vision_images"] is None
     assert invocation["text_origin"] == "file"
-    assert service._pdf.render_calls == 0
-    assert service.ocr_invocations == 0
+    assert pdf_stub.render_calls == 0
+    assert extraction_service.ocr_invocations == 0
     assert result.text_origin == "file"
 
 
-def test_extraction_service_never_enables_vision_for_json():
+def test_extraction_service_never_enables_vision_for_json(extraction_service, pdf_stub):
     """Los JSON deben ignorar indicadores de OCR o Visión forzados."""
 
-    service = _InstrumentedExtractionService()
-
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "factura.json",
         b'{"monto": 100}',
         "application/json",
@@ -360,102 +510,232 @@ def test_extraction_service_never_enables_vision_for_json():
         force_ocr=True,
     )
 
-    invocation = service.text_invocations[-1]
+    invocation = extraction_service.text_invocations[-1]
     assert invocation["text"] == '{"monto": 100}'
     assert invocation["vision_images"] is None
     assert invocation["text_origin"] == "file"
-    assert service._pdf.render_calls == 0
-    assert service.ocr_invocations == 0
+    assert pdf_stub.render_calls == 0
+    assert extraction_service.ocr_invocations == 0
     assert result.text_origin == "file"
 
 
-def test_extraction_service_uses_ocr_when_forced():
+def test_extraction_service_uses_ocr_when_forced(
+    extraction_service,
+    pdf_stub,
+    ocr_stub,
+):
     """Forzar OCR debe reemplazar el texto plano y marcar el origen correcto."""
 
-    service = _InstrumentedExtractionService()
-    service._pdf.text = "texto directo"
-    service._ocr_stub.text = "texto via ocr"
+    pdf_stub.text = "texto directo"
+    ocr_stub.text = "FACTURA via ocr RUC 1790012345001"
 
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "factura.pdf", b"%PDF", "application/pdf", force_ocr=True
     )
 
-    invocation = service.text_invocations[-1]
-    assert invocation["text"] == "texto via ocr"
+    invocation = extraction_service.text_invocations[-1]
+    assert invocation["text"] == "FACTURA via ocr RUC 1790012345001"
     assert invocation["vision_images"] is None
     assert invocation["text_origin"] == "ocr"
-    assert service.ocr_invocations == 1
+    assert extraction_service.ocr_invocations == 1
+    assert result.text_origin == "ocr"
+
+
+def test_extraction_service_skips_ocr_for_born_digital_pdf_images(
+    extraction_service,
+    pdf_stub,
+):
+    """Los PDF con texto embebido suficiente no deben pasar por OCR en la ruta de imágenes."""
+
+    pdf_stub.text = "FACTURA " * 200
+
+    result = extraction_service.extract_from_image(
+        "factura.pdf", b"%PDF", "application/pdf", use_ocr=True
+    )
+
+    invocation = extraction_service.text_invocations[-1]
+    assert invocation["text"] == pdf_stub.text
+    assert invocation["text_origin"] == "file"
+    assert extraction_service.ocr_invocations == 0
+    assert pdf_stub.read_calls == 1
+    assert result.text_origin == "file"
+
+
+def test_extraction_service_ocrs_scanned_pdf_images(
+    extraction_service,
+    pdf_stub,
+    ocr_stub,
+):
+    """Los PDF con poco texto embebido siguen requiriendo OCR en la ruta de imágenes."""
+
+    pdf_stub.text = "p. 1"
+    ocr_stub.text = "FACTURA via ocr RUC 1790012345001"
+
+    result = extraction_service.extract_from_image(
+        "factura.pdf", b"%PDF", "application/pdf", use_ocr=True
+    )
+
+    invocation = extraction_service.text_invocations[-1]
+    assert invocation["text"] == "FACTURA via ocr RUC 1790012345001"
+    assert invocation["text_origin"] == "ocr"
+    assert extraction_service.ocr_invocations == 1
     assert result.text_origin == "ocr"
 
 
-def test_extraction_service_respects_disabled_ocr_for_pdfs():
+def test_extraction_service_ocrs_rendered_pages_in_order(extraction_service, pdf_stub):
+    """El OCR por página debe conservar el orden aunque se ejecute en paralelo."""
+
+    class _PageOCRService:
+        def extract_text(self, data: bytes, content_type: str | None = None) -> str:
+            if content_type == "application/pdf":
+                return ""
+            return data.decode().upper()
+
+    pdf_stub.images = [(f"page-{index}".encode(), "image/png") for index in range(6)]
+
+    text = extraction_service._extract_text_from_pdf_with_ocr(b"%PDF", _PageOCRService())
+
+    assert text == "\n\n".join(f"PAGE-{index}" for index in range(6))
+    assert pdf_stub.render_calls == 1
+
+
+@pytest.mark.parametrize(
+    "ocr_text",
+    [
+        "x7 #@ ruido",
+        # Las palabras clave dentro de otras palabras no cuentan como indicio
+        "La cuenta activa y efectiva según la instrucción 123456 del 2024",
+    ],
+)
+def test_extraction_service_rejects_non_invoice_ocr_text(
+    extraction_service, ocr_stub, ocr_text
+):
+    """El texto OCR sin indicios de factura no debe llegar al modelo."""
+
+    ocr_stub.text = ocr_text
+
+    with pytest.raises(RuntimeError, match="no parece una factura"):
+        extraction_service.extract_from_file("foto.png", b"\x89PNGdatos", "image/png")
+    with pytest.raises(RuntimeError, match="no parece una factura"):
+        extraction_service.extract_from_file(
+            "factura.pdf", b"%PDF", "application/pdf", force_ocr=True
+        )
+
+    assert extraction_service.text_invocations == []
+
+
+@pytest.mark.parametrize(
+    "ocr_text",
+    [
+        "R.U.C. 1790012345001 Comprobante de venta",
+        "R U C: 1790012345001 Comprobante de venta",
+        "Base imponible 100,00 I.V.A. 12% 12,00",
+        # Comprobante real sin la palabra "FACTURA"
+        "COMPROBANTE DE VENTA No. 001-002-000004567 RUC 0991234567001 "
+        "VALOR A PAGAR 1.120,00",
+    ],
+)
+def test_extraction_service_accepts_ocr_invoice_spellings(
+    extraction_service, ocr_stub, ocr_text
+):
+    """Las siglas con puntos o espacios cuentan como indicio de factura."""
+
+    ocr_stub.text = ocr_text
+
+    extraction_service.extract_from_file("foto.png", b"\x89PNGdatos", "image/png")
+
+    assert extraction_service.text_invocations[-1]["text"] == ocr_text
+
+
+def test_extraction_service_keeps_weak_ocr_text_when_vision_enabled(
+    extraction_service,
+    ocr_stub,
+):
+    """Con Visión activa la imagen aporta contexto aunque el OCR sea pobre."""
+
+    ocr_stub.text = "x7 #@ ruido"
+
+    extraction_service.extract_from_file("foto.png", b"\x89PNGdatos", "image/png", use_vision=True)
+
+    assert extraction_service.text_invocations[-1]["text"] == "x7 #@ ruido"
+
+
+def test_extraction_service_respects_disabled_ocr_for_pdfs(
+    extraction_service,
+    pdf_stub,
+    ocr_stub,
+):
     """Los PDF sin texto deben conservar el origen 'file' cuando el OCR está apagado."""
 
-    service = _InstrumentedExtractionService()
-    service._pdf.text = ""
-    service._ocr_stub.text = "texto recuperado"
+    pdf_stub.text = ""
+    ocr_stub.text = "texto recuperado"
 
-    result = service.extract_from_file("factura.pdf", b"%PDF", "application/pdf")
+    result = extraction_service.extract_from_file("factura.pdf", b"%PDF", "application/pdf")
 
-    invocation = service.text_invocations[-1]
+    invocation = extraction_service.text_invocations[-1]
     assert invocation["text"] == ""
     assert invocation["text_origin"] == "file"
     assert invocation["vision_images"] is None
-    assert service.ocr_invocations == 0
+    assert extraction_service.ocr_invocations == 0
     assert result.raw_text == ""
     assert result.text_origin == "file"
 
 
-def test_extraction_service_omits_pixels_when_vision_disabled_for_images():
+def test_extraction_service_omits_pixels_when_vision_disabled_for_images(
+    extraction_service,
+    ocr_stub,
+):
     """Las imágenes respetan la bandera de Visión y solo usan OCR obligatorio."""
 
-    service = _InstrumentedExtractionService()
-    service._ocr_stub.text = "texto imagen"
+    ocr_stub.text = "FACTURA imagen TOTAL 1120.00"
 
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "foto.png",
         b"\x89PNGdatos",
         "image/png",
         use_vision=False,
     )
 
-    invocation = service.text_invocations[-1]
-    assert invocation["text"] == "texto imagen"
+    invocation = extraction_service.text_invocations[-1]
+    assert invocation["text"] == "FACTURA imagen TOTAL 1120.00"
     assert invocation["vision_images"] is None
-    assert service.vision_invocations == []
+    assert extraction_service.vision_invocations == []
     assert invocation["text_origin"] == "ocr"
     assert result.text_origin == "ocr"
 
 
-def test_extraction_service_adds_pixels_when_vision_enabled_for_images():
+def test_extraction_service_adds_pixels_when_vision_enabled_for_images(
+    extraction_service,
+    ocr_stub,
+):
     """La bandera Visión en imágenes adjunta la captura en base64 al modelo."""
 
-    service = _InstrumentedExtractionService()
-    service._ocr_stub.text = "texto imagen"
+    ocr_stub.text = "FACTURA imagen TOTAL 1120.00"
 
-    result = service.extract_from_file(
+    result = extraction_service.extract_from_file(
         "foto.png",
         b"\x89PNGdatos",
         "image/png",
         use_vision=True,
     )
 
-    invocation = service.text_invocations[-1]
-    assert invocation["text"] == "texto imagen"
+    invocation = extraction_service.text_invocations[-1]
+    assert invocation["text"] == "FACTURA imagen TOTAL 1120.00"
     assert invocation["vision_images"] == [
         {"media_type": "image/png", "data": "encoded-0"},
     ]
-    assert service.vision_invocations[-1] == [(b"\x89PNGdatos", "image/png")]
+    assert extraction_service.vision_invocations[-1] == [(b"\x89PNGdatos", "image/png")]
     assert invocation["text_origin"] == "ocr"
     assert result.text_origin == "ocr"
 
 
-def test_extraction_service_skips_ocr_when_disabled_for_images():
+def test_extraction_service_skips_ocr_when_disabled_for_images(
+    extraction_service,
+    ocr_stub,
+):
     """Al desactivar OCR, solo se envía la captura visual al modelo."""
 
-    service = _InstrumentedExtractionService()
-
-    result = service.extract_from_image(
+    result = extraction_service.extract_from_image(
         "foto.png",
         b"\x89PNGdatos",
         "image/png",
@@ -463,23 +743,21 @@ def test_extraction_service_skips_ocr_when_disabled_for_images():
         use_ocr=False,
     )
 
-    invocation = service.text_invocations[-1]
+    invocation = extraction_service.text_invocations[-1]
     assert invocation["text"] == ""
     assert invocation["vision_images"] == [
         {"media_type": "image/png", "data": "encoded-0"},
     ]
-    assert service._ocr_stub.calls == []
+    assert ocr_stub.calls == []
     assert invocation["text_origin"] == "file"
     assert result.text_origin == "file"
 
 
-def test_extraction_service_requires_modality_for_images():
+def test_extraction_service_requires_modality_for_images(extraction_service):
     """Debe exigir al menos OCR o Visión para procesar una imagen."""
 
-    service = _InstrumentedExtractionService()
-
     with pytest.raises(RuntimeError) as excinfo:
-        service.extract_from_image(
+        extraction_service.extract_from_image(
             "foto.png",
             b"\x89PNGdatos",
             "image/png",
@@ -488,3 +766,64 @@ def test_extraction_service_requires_modality_for_images():
         )
 
     assert "Activa OCR o Visión" in str(excinfo.value)
+
+
+def _image_bytes(size: tuple[int, int], image_format: str) -> bytes:
+    image_module = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    image_module.new("RGB", size, (200, 30, 30)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_encode_vision_images_downscales_large_scans():
+    """Las imágenes mayores al límite deben reducirse antes de codificarse."""
+
+    image_module = pytest.importorskip("PIL.Image")
+    service = ExtractionService(Config(VISION_MAX_IMAGE_SIDE=512))
+    original = _image_bytes((2000, 1000), "PNG")
+
+    encoded = service._encode_vision_images([(original, "image/png")])
+
+    assert encoded is not None and encoded[0]["media_type"] == "image/png"
+    resized = image_module.open(io.BytesIO(base64.b64decode(encoded[0]["data"])))
+    assert resized.size == (512, 256)
+
+
+def test_encode_vision_images_keeps_small_supported_images():
+    """Las imágenes pequeñas y compatibles se envían sin recodificar."""
+
+    service = ExtractionService(Config(VISION_MAX_IMAGE_SIDE=512))
+    original = _image_bytes((100, 80), "JPEG")
+
+    encoded = service._encode_vision_images([(original, "image/jpeg")])
+
+    assert encoded == [
+        {"media_type": "image/jpeg", "data": base64.b64encode(original).decode("ascii")}
+    ]
+
+
+def test_encode_vision_images_converts_tiff_to_png():
+    """Los TIFF no son aceptados por Visión y deben convertirse a PNG."""
+
+    service = ExtractionService(Config(VISION_MAX_IMAGE_SIDE=512))
+    original = _image_bytes((100, 80), "TIFF")
+
+    encoded = service._encode_vision_images([(original, "image/tiff")])
+
+    assert encoded is not None and encoded[0]["media_type"] == "image/png"
+    assert base64.b64decode(encoded[0]["data"]).startswith(b"\x89PNG")
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_json_response_serializes_with_or_without_orjson(monkeypatch, use_orjson):
+    """La respuesta JSON debe funcionar aunque orjson no esté instalado."""
+
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(responses, "orjson", None)
+    payload = {"MARCA": "KIA", "AÑO": 2024, "TOTAL": 15000.5, "RUEDAS": None}
+
+    response = responses.FastJSONResponse(payload)
+
+    assert json.loads(response.body) == payload
@@ -0,0 +1,160 @@
+"""Pruebas para la interpretación de respuestas de los servicios LLM."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from app.config import Config
+from app.services import llm_service
+from app.services.llm_service import OpenAILLMService, _parse_model_response
+
+
+_DEFAULT_CONTENT = '{"MARCA": "KIA"}'
+
+
+def _stream(content: str):
+    """Construye la secuencia de eventos que devuelve ``create(stream=True)``."""
+
+    pieces = [content[index : index + 5] for index in range(0, len(content), 5)]
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+        for piece in pieces
+    ]
+    # El último evento del stream no trae opciones (solo métricas de uso)
+    chunks.append(SimpleNamespace(choices=[]))
+    return iter(chunks)
+
+
+def _new_client(**_kwargs) -> MagicMock:
+    """Crea un cliente simulado que responde siempre con el contenido por defecto."""
+
+    client = MagicMock(name="OpenAI()")
+    client.chat.completions.create.side_effect = lambda **_: _stream(_DEFAULT_CONTENT)
+    return client
+
+
+@pytest.fixture
+def openai_factory():
+    """Sustituye el constructor de OpenAI por uno que crea clientes simulados."""
+
+    with patch.object(llm_service, "OpenAI", side_effect=_new_client) as factory:
+        yield factory
+
+
+def test_parse_model_response_returns_object():
+    """Una respuesta JSON con un objeto debe convertirse en diccionario."""
+
+    parsed = _parse_model_response('{"MARCA": "KIA", "TOTAL": 15000.5, "RUEDAS": null}')
+
+    assert parsed == {"MARCA": "KIA", "TOTAL": 15000.5, "RUEDAS": None}
+
+
+def test_parse_model_response_without_orjson(monkeypatch):
+    """Sin orjson instalado debe usarse el analizador JSON de pydantic."""
+
+    monkeypatch.setattr(llm_service, "orjson", None)
+
+    assert _parse_model_response('{"AÑO": 2024}') == {"AÑO": 2024}
+    with pytest.raises(RuntimeError):
+        _parse_model_response("[]")
+
+
+@pytest.mark.parametrize("raw", ["no es json", "[1, 2]", '"texto"'])
+def test_parse_model_response_rejects_invalid_payloads(raw):
+    """Las respuestas que no son un objeto JSON deben producir un error claro."""
+
+    with pytest.raises(RuntimeError) as excinfo:
+        _parse_model_response(raw)
+
+    assert "JSON válido" in str(excinfo.value)
+
+
+def test_openai_service_reuses_configured_client(openai_factory):
+    """Las solicitudes con la clave configurada deben compartir un único cliente."""
+
+    service = OpenAILLMService(Config(OPENAI_API_KEY="clave-configurada"))
+
+    assert service.extract("factura") == {"MARCA": "KIA"}
+    service.extract("factura")
+
+    openai_factory.assert_called_once_with(api_key="clave-configurada")
+    client = service._client
+    create = client.chat.completions.create
+    assert create.call_count == 2
+    assert all(args.kwargs["stream"] is True for args in create.call_args_list)
+    client.close.assert_not_called()
+
+
+def test_openai_service_closes_clients_for_user_keys(openai_factory):
+    """Las claves del usuario usan un cliente temporal que se cierra al terminar."""
+
+    service = OpenAILLMService(Config(OPENAI_API_KEY="clave-configurada"))
+    clients: list[MagicMock] = []
+
+    def _track(**kwargs):
+        clients.append(_new_client(**kwargs))
+        return clients[-1]
+
+    openai_factory.side_effect = _track
+
+    service.extract("factura", api_key="clave-usuario")
+    service.extract("factura", api_key="clave-usuario")
+
+    assert openai_factory.call_args_list == [
+        call(api_key="clave-usuario"),
+        call(api_key="clave-usuario"),
+    ]
+    assert service._client is None
+    for client in clients:
+        client.close.assert_called_once_with()
+
+
+def test_openai_service_requires_api_key(openai_factory):
+    """Sin clave configurada ni proporcionada no debe crearse ningún cliente."""
+
+    service = OpenAILLMService(Config(OPENAI_API_KEY=None))
+
+    with pytest.raises(RuntimeError):
+        service.extract("factura")
+
+    openai_factory.assert_not_called()
+
+
+def test_openai_service_retries_with_feedback_on_invalid_json(openai_factory):
+    """Una respuesta inválida debe reenviarse al modelo junto con el error detectado."""
+
+    service = OpenAILLMService(Config(OPENAI_API_KEY="clave"))
+    client = _new_client()
+    openai_factory.side_effect = None
+    openai_factory.return_value = client
+    create = client.chat.completions.create
+    create.side_effect = [_stream('{"MARCA": '), _stream(_DEFAULT_CONTENT)]
+
+    assert service.extract("factura") == {"MARCA": "KIA"}
+
+    assert create.call_count == 2
+    first_call, retry_call = create.call_args_list
+    retry_messages = retry_call.kwargs["messages"]
+    assert retry_messages[:2] == first_call.kwargs["messages"]
+    assert retry_messages[2] == {"role": "assistant", "content": '{"MARCA": '}
+    assert retry_messages[3]["role"] == "user"
+    assert "no es válida" in retry_messages[3]["content"]
+
+
+def test_openai_service_gives_up_after_max_attempts(openai_factory):
+    """Tras agotar los intentos se informa el error al llamador."""
+
+    service = OpenAILLMService(Config(OPENAI_API_KEY="clave"))
+    client = _new_client()
+    openai_factory.side_effect = None
+    openai_factory.return_value = client
+    create = client.chat.completions.create
+    create.side_effect = lambda **_: _stream("sin json")
+
+    with pytest.raises(RuntimeError) as excinfo:
+        service.extract("factura")
+
+    assert create.call_count == llm_service._MAX_RESPONSE_ATTEMPTS
+    assert "JSON válido" in str(excinfo.value)
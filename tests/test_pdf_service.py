@@ -0,0 +1,47 @@
+"""Pruebas para la división de texto en bloques del extractor de PDF."""
+from __future__ import annotations
+
+from app.services.pdf_service import PDFTextExtractor
+
+
+def test_chunk_text_returns_single_block_when_short():
+    """Un texto dentro del límite debe devolverse sin modificaciones."""
+
+    extractor = PDFTextExtractor(max_chars_per_chunk=100)
+
+    assert extractor.chunk_text("Factura corta.") == ["Factura corta."]
+
+
+def test_chunk_text_prefers_paragraph_boundaries():
+    """Los cortes deben priorizar saltos de párrafo sobre finales de oración."""
+
+    extractor = PDFTextExtractor(max_chars_per_chunk=30)
+    text = "Linea uno. Linea dos\n\nLinea tres. Linea cuatro\n\nFin"
+
+    assert extractor.chunk_text(text) == [
+        "Linea uno. Linea dos",
+        "Linea tres. Linea cuatro",
+        "Fin",
+    ]
+
+
+def test_chunk_text_falls_back_to_sentences_and_hard_cuts():
+    """Sin párrafos se corta por oraciones y, en último caso, por longitud."""
+
+    extractor = PDFTextExtractor(max_chars_per_chunk=12)
+
+    assert extractor.chunk_text("Total 100. IVA 12. Subtotal") == [
+        "Total 100",
+        ". IVA 12",
+        ". Subtotal",
+    ]
+    assert extractor.chunk_text("x" * 30) == ["x" * 12, "x" * 12, "x" * 6]
+
+
+def test_chunk_text_advances_past_leading_separator():
+    """Un separador al inicio del bloque no debe detener el avance del corte."""
+
+    extractor = PDFTextExtractor(max_chars_per_chunk=10)
+    text = "abcdefgh\n\nijklmnopqrstuv"
+
+    assert extractor.chunk_text(text) == ["abcdefgh", "ijklmnop", "qrstuv"]
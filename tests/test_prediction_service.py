@@ -1,8 +1,12 @@
 """Pruebas enfocadas en la lógica auxiliar del servicio de predicciones."""
 from __future__ import annotations
 
+import os
 from types import SimpleNamespace
 
+import pytest
+
+from app.services import prediction_service
 from app.services.prediction_service import PredictionService
 
 
@@ -16,9 +20,8 @@ class _AmbiguousSequence(list):
 def test_resolve_feature_columns_handles_ambiguous_sequences():
     """Debe manejar `feature_names_in_` que no permiten evaluación booleana directa."""
 
-    service = object.__new__(PredictionService)
-    service._model = SimpleNamespace(
-        feature_names_in_=_AmbiguousSequence([  # type: ignore[attr-defined]
+    model = SimpleNamespace(
+        feature_names_in_=_AmbiguousSequence([
             "marca",
             "tipo",
             "clase",
@@ -29,7 +32,7 @@ def test_resolve_feature_columns_handles_ambiguous_sequences():
         ])
     )
 
-    columns = PredictionService._resolve_feature_columns(service)
+    columns = PredictionService._resolve_feature_columns(model)
 
     assert columns == [
         "marca",
@@ -40,3 +43,118 @@ def test_resolve_feature_columns_handles_ambiguous_sequences():
         "ruedas",
         "total",
     ]
+
+
+def test_resolve_feature_columns_converts_numpy_arrays():
+    """Los nombres en un ``ndarray`` se devuelven como cadenas de Python."""
+
+    np = pytest.importorskip("numpy")
+    model = SimpleNamespace(feature_names_in_=np.array(["marca", "total"], dtype=object))
+
+    columns = PredictionService._resolve_feature_columns(model)
+
+    assert columns == ["marca", "total"]
+    assert all(type(column) is str for column in columns)
+
+
+def test_load_model_reuses_cached_model_until_file_changes(tmp_path, monkeypatch):
+    """El modelo se deserializa una vez y se vuelve a leer solo si cambia en disco."""
+
+    loads: list[str] = []
+
+    def _fake_load(path: str) -> SimpleNamespace:
+        loads.append(path)
+        return SimpleNamespace(feature_names_in_=["total"])
+
+    monkeypatch.setattr(prediction_service, "joblib", SimpleNamespace(load=_fake_load))
+    prediction_service._load_model_file.cache_clear()
+    model_path = tmp_path / "modelo.pkl"
+    model_path.write_bytes(b"v1")
+
+    first = PredictionService(model_path)
+    second = PredictionService(model_path)
+
+    assert first._state[0] is second._state[0]
+    assert len(loads) == 1
+
+    model_path.write_bytes(b"v2-reentrenado")
+    os.utime(model_path, ns=(0, model_path.stat().st_mtime_ns + 1_000_000))
+    second.reload()
+
+    assert second._state[0] is not first._state[0]
+    assert len(loads) == 2
+    assert prediction_service._load_model_file.cache_info().currsize == 1
+    prediction_service._load_model_file.cache_clear()
+
+
+class _RecordingModel:
+    """Modelo simulado que registra cuántas veces se invoca por lote."""
+
+    classes_ = ["COMERCIAL", "FAMILIAR"]
+    feature_names_in_ = ["marca", "total"]
+
+    def __init__(self) -> None:
+        self.frames: list[object] = []
+
+    def predict(self, frame):
+        self.frames.append(frame)
+        return ["FAMILIAR" if total > 100 else "COMERCIAL" for total in frame["total"]]
+
+    def predict_proba(self, frame):
+        return [[0.1, 0.9] if total > 100 else [0.8, 0.2] for total in frame["total"]]
+
+
+def test_predict_batch_evaluates_all_rows_in_one_call(tmp_path, monkeypatch):
+    """Todas las filas del lote se evalúan con un único DataFrame."""
+
+    pytest.importorskip("pandas")
+    model = _RecordingModel()
+    monkeypatch.setattr(prediction_service, "joblib", SimpleNamespace(load=lambda path: model))
+    prediction_service._load_model_file.cache_clear()
+    model_path = tmp_path / "modelo.pkl"
+    model_path.write_bytes(b"modelo")
+    service = PredictionService(model_path)
+
+    results = service.predict_batch(
+        [{"total": 50.0, "marca": "KIA"}, {"marca": "FORD", "total": 500.0}]
+    )
+
+    assert len(model.frames) == 1
+    assert list(model.frames[0].columns) == ["marca", "total"]
+    assert [result.predicted_class for result in results] == ["COMERCIAL", "FAMILIAR"]
+    assert dict(results[1].probabilities) == {"COMERCIAL": 0.1, "FAMILIAR": 0.9}
+    assert service.predict_batch([]) == []
+    prediction_service._load_model_file.cache_clear()
+
+
+def test_prediction_service_declares_slots():
+    """Las instancias no reservan ``__dict__`` por objeto."""
+
+    assert "__dict__" not in PredictionService.__dict__
+
+
+def test_reload_replaces_model_and_columns_together(tmp_path, monkeypatch):
+    """El modelo y su orden de columnas se publican juntos tras recargar."""
+
+    models = iter(
+        [
+            SimpleNamespace(feature_names_in_=["marca"]),
+            SimpleNamespace(feature_names_in_=["marca", "total"]),
+        ]
+    )
+    monkeypatch.setattr(
+        prediction_service, "joblib", SimpleNamespace(load=lambda path: next(models))
+    )
+    prediction_service._load_model_file.cache_clear()
+    model_path = tmp_path / "modelo.pkl"
+    model_path.write_bytes(b"v1")
+    service = PredictionService(model_path)
+
+    model_path.write_bytes(b"v2-reentrenado")
+    os.utime(model_path, ns=(0, model_path.stat().st_mtime_ns + 1_000_000))
+    service.reload()
+
+    model, columns = service._state
+    assert columns == ["marca", "total"]
+    assert model.feature_names_in_ == ["marca", "total"]
+    prediction_service._load_model_file.cache_clear()
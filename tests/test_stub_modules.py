@@ -0,0 +1,34 @@
+"""Pruebas del sustituto de Pydantic usado cuando la dependencia no está instalada."""
+from __future__ import annotations
+
+import pytest
+
+from tests._stub_modules.pydantic import BaseModel, Field, field_validator
+
+
+class _Vehiculo(BaseModel):
+    marca: str = Field(..., description="Marca del vehículo.")
+    ruedas: int = 4
+
+    @field_validator("marca", mode="before")
+    @classmethod
+    def _upper(cls, value):
+        return value.strip().upper()
+
+
+def test_stub_base_model_uses_slots_for_fields():
+    """Los campos se almacenan en ``__slots__`` sin ``__dict__`` por instancia."""
+
+    vehiculo = _Vehiculo(marca=" ford ")
+
+    assert _Vehiculo.__slots__ == ("marca", "ruedas")
+    with pytest.raises(AttributeError):
+        vehiculo.__dict__
+    assert vehiculo.model_dump() == {"marca": "FORD", "ruedas": 4}
+
+
+def test_stub_base_model_requires_fields_without_default():
+    """Los campos declarados con ``...`` siguen siendo obligatorios."""
+
+    with pytest.raises(ValueError, match="marca"):
+        _Vehiculo(ruedas=6)
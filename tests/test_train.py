@@ -0,0 +1,196 @@
+"""Pruebas de las utilidades puras del entrenamiento del Random Forest."""
+from __future__ import annotations
+
+import os
+import sys
+import types
+
+import pytest
+
+from train import train as train_module
+from train.train import (
+    _dump_model,
+    _normalize_report,
+    _read_dataset,
+    _split_indices,
+    train_random_forest,
+)
+
+
+def test_normalize_report_keeps_numeric_metrics_only():
+    """Las métricas numéricas se convierten a float y los escalares se envuelven."""
+
+    report = {
+        "COMERCIAL": {"precision": 1, "recall": 0.5, "support": 2, "nota": "n/a"},
+        "accuracy": 0.75,
+        "comentario": "sin métricas",
+    }
+
+    assert _normalize_report(report) == {
+        "COMERCIAL": {"precision": 1.0, "recall": 0.5, "support": 2.0},
+        "accuracy": {"score": 0.75},
+    }
+
+
+def test_split_indices_are_cached_next_to_dataset(tmp_path):
+    """La partición se calcula una vez y se reutiliza desde el ``.npz``."""
+
+    np = pytest.importorskip("numpy")
+
+    dataset = tmp_path / "dataset.csv"
+    dataset.write_text("categoria\n")
+    y = np.array(["A", "B"] * 5)
+    calls = []
+
+    def counting_split(indices, **kwargs):
+        calls.append(kwargs)
+        return indices[:8], indices[8:]
+
+    first = _split_indices(
+        np, counting_split, dataset, y, test_size=0.2, random_state=7
+    )
+    second = _split_indices(
+        np, counting_split, dataset, y, test_size=0.2, random_state=7
+    )
+    _split_indices(np, counting_split, dataset, y, test_size=0.3, random_state=7)
+
+    assert len(calls) == 2
+    assert calls[0]["stratify"] is y
+    assert [path.name for path in tmp_path.glob("*.npz")] == ["dataset.split.npz"]
+    assert [part.tolist() for part in second] == [part.tolist() for part in first]
+    assert second[1].tolist() == [8, 9]
+
+
+def test_split_indices_key_on_the_file_actually_read(tmp_path):
+    """La clave usa el archivo leído, por ejemplo la copia Parquet."""
+
+    np = pytest.importorskip("numpy")
+
+    dataset = tmp_path / "dataset.csv"
+    dataset.write_text("categoria\n")
+    parquet = tmp_path / "dataset.parquet"
+    parquet.write_bytes(b"v1")
+    y = np.array(["A", "B"] * 5)
+    calls = []
+
+    def counting_split(indices, **kwargs):
+        calls.append(kwargs)
+        return indices[:8], indices[8:]
+
+    options = {"test_size": 0.2, "random_state": 7, "source": parquet}
+    _split_indices(np, counting_split, dataset, y, **options)
+    os.utime(parquet, ns=(0, parquet.stat().st_mtime_ns + 1_000_000))
+    _split_indices(np, counting_split, dataset, y, **options)
+
+    assert len(calls) == 2
+
+
+def test_read_dataset_writes_parquet_sidecar(tmp_path):
+    """Tras leer el CSV se guarda la copia Parquet, que se usa en adelante."""
+
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+
+    dataset = tmp_path / "dataset.csv"
+    dataset.write_text("marca,total\nKIA,10.5\n")
+
+    frame, source = _read_dataset(pd, None, dataset)
+    cached, cached_source = _read_dataset(pd, None, dataset)
+
+    assert source == dataset
+    assert cached_source == tmp_path / "dataset.parquet"
+    assert cached.to_dict("records") == frame.to_dict("records")
+
+
+def test_train_random_forest_rejects_unknown_estimator(tmp_path):
+    """Un estimador desconocido se rechaza antes de leer el dataset."""
+
+    with pytest.raises(ValueError) as excinfo:
+        train_random_forest(tmp_path / "no-existe.csv", estimator="svm")
+
+    assert "hist_gradient_boosting" in str(excinfo.value)
+
+
+@pytest.mark.parametrize("lz4_spec, compress", [(object(), ("lz4", 3)), (None, 0)])
+def test_dump_model_compresses_only_with_lz4(monkeypatch, tmp_path, lz4_spec, compress):
+    """La compresión lz4 se usa solo si la librería está instalada."""
+
+    calls = []
+
+    class _RecordingJoblib:
+        @staticmethod
+        def dump(value, destination, **kwargs):
+            calls.append((value, destination, kwargs))
+
+    monkeypatch.setattr(
+        train_module.importlib.util, "find_spec", lambda name: lz4_spec
+    )
+
+    _dump_model(_RecordingJoblib, "pipeline", tmp_path / "modelo.pkl")
+
+    assert calls == [
+        ("pipeline", tmp_path / "modelo.pkl", {"compress": compress, "protocol": 5})
+    ]
+
+
+class _IntegerOnlyForest:
+    """Sustituto de cuML que, como este, solo acepta etiquetas enteras."""
+
+    def __init__(self) -> None:
+        self.fit_dtypes: tuple[str, str] | None = None
+
+    def fit(self, X, y):
+        self.fit_dtypes = (X.dtype.name, y.dtype.name)
+        self._codes = y
+        return self
+
+    def predict(self, X):
+        return self._codes[: len(X)]
+
+    def predict_proba(self, X):
+        return [[1.0] for _ in range(len(X))]
+
+
+def test_encoded_label_classifier_round_trips_labels():
+    """Las etiquetas de texto sobreviven intactas al ciclo fit/predict."""
+
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("sklearn")
+    from train.gpu import EncodedLabelClassifier
+
+    labels = np.array(["Rural", "Ejecutivo", "Transporte público / comercial", "Rural"])
+    forest = _IntegerOnlyForest()
+    classifier = EncodedLabelClassifier(forest).fit(np.ones((4, 2)), labels)
+
+    assert forest.fit_dtypes == ("float32", "int32")
+    assert classifier.predict(np.ones((4, 2))).tolist() == labels.tolist()
+    assert classifier.classes_.tolist() == sorted(set(labels.tolist()))
+
+
+def test_train_dependencies_do_not_import_cuml(monkeypatch):
+    """cuML solo se importa en la rama de GPU, no al cargar dependencias."""
+
+    pytest.importorskip("pandas")
+    pytest.importorskip("sklearn")
+    lookups = []
+
+    def record_lookup(name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        lookups.append(name)
+        return object
+
+    ensemble = types.ModuleType("cuml.ensemble")
+    ensemble.__getattr__ = record_lookup  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "cuml", types.ModuleType("cuml"))
+    monkeypatch.setitem(sys.modules, "cuml.ensemble", ensemble)
+    train_module._ensure_dependencies.cache_clear()
+    train_module._load_cuml_forest.cache_clear()
+    try:
+        train_module._ensure_dependencies()
+        assert lookups == []
+        assert train_module._load_cuml_forest() is object
+        assert lookups == ["RandomForestClassifier"]
+    finally:
+        train_module._ensure_dependencies.cache_clear()
+        train_module._load_cuml_forest.cache_clear()
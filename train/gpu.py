@@ -0,0 +1,36 @@
+"""Adaptadores para entrenar el Random Forest en GPU con RAPIDS cuML.
+
+Solo se importa cuando el entrenamiento se solicita en GPU, por lo que puede
+depender directamente de NumPy y scikit-learn.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+
+class EncodedLabelClassifier(ClassifierMixin, BaseEstimator):
+    """Adapta un clasificador de cuML, que solo admite etiquetas enteras.
+
+    Las categorías se codifican como enteros ``int32`` antes de entrenar y se
+    decodifican al predecir, de modo que el pipeline guardado expone las mismas
+    ``classes_`` que el Random Forest de scikit-learn.
+    """
+
+    def __init__(self, estimator) -> None:  # type: ignore[no-untyped-def]
+        self.estimator = estimator
+
+    def fit(self, X, y):  # type: ignore[no-untyped-def]
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        self.estimator.fit(np.asarray(X, dtype=np.float32), codes.astype(np.int32))
+        return self
+
+    def predict(self, X):  # type: ignore[no-untyped-def]
+        codes = self.estimator.predict(np.asarray(X, dtype=np.float32))
+        return self.classes_[np.asarray(codes).astype(np.intp)]
+
+    def predict_proba(self, X):  # type: ignore[no-untyped-def]
+        return np.asarray(
+            self.estimator.predict_proba(np.asarray(X, dtype=np.float32))
+        )
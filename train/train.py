@@ -8,7 +8,11 @@ utilizado para el entrenamiento en la ruta indicada por
 
 from __future__ import annotations
 
+import hashlib
+import importlib.util
 from dataclasses import dataclass
+from functools import lru_cache
+from numbers import Real
 from pathlib import Path
 from typing import Dict, List, Mapping, MutableMapping, Sequence
 
@@ -16,6 +20,11 @@ DEFAULT_DATASET_PATH = Path(
     "train/data/verifactura_dataset.csv"
 )
 
+# Clasificadores admitidos por ``train_random_forest``
+ESTIMATOR_RANDOM_FOREST = "random_forest"
+ESTIMATOR_HIST_GRADIENT_BOOSTING = "hist_gradient_boosting"
+SUPPORTED_ESTIMATORS = (ESTIMATOR_RANDOM_FOREST, ESTIMATOR_HIST_GRADIENT_BOOSTING)
+
 
 @dataclass(frozen=True)
 class RandomForestTrainingResult:
@@ -33,19 +42,28 @@ class _TrainingDependencies(dict):
     """Mapa de dependencias necesarias para el entrenamiento."""
 
     pd: object  # pandas
+    np: object  # numpy
+    pacsv: object | None  # pyarrow.csv (opcional)
     joblib: object
     ColumnTransformer: object
     OneHotEncoder: object
     StandardScaler: object
     Pipeline: object
     RandomForestClassifier: object
+    HistGradientBoostingClassifier: object
+    OrdinalEncoder: object
     train_test_split: object
     classification_report: object
     confusion_matrix: object
 
 
+@lru_cache(maxsize=1)
 def _ensure_dependencies() -> _TrainingDependencies:
-    """Importa las dependencias de entrenamiento con mensajes amigables."""
+    """Importa las dependencias de entrenamiento con mensajes amigables.
+
+    El resultado se memoriza para que los reentrenamientos sucesivos no repitan
+    las importaciones; si falta alguna dependencia el error no se cachea.
+    """
 
     missing: List[str] = []
     modules: MutableMapping[str, object] = {}
@@ -57,6 +75,20 @@ def _ensure_dependencies() -> _TrainingDependencies:
     except ModuleNotFoundError:
         missing.append("pandas")
 
+    try:
+        import numpy as np  # type: ignore
+
+        modules["np"] = np
+    except ModuleNotFoundError:
+        missing.append("numpy")
+
+    try:
+        import pyarrow.csv as pacsv  # type: ignore
+    except ModuleNotFoundError:
+        # pyarrow es opcional: sin él se usa el lector CSV de pandas
+        pacsv = None
+    modules["pacsv"] = pacsv
+
     try:
         import joblib  # type: ignore
 
@@ -66,21 +98,30 @@ def _ensure_dependencies() -> _TrainingDependencies:
 
     try:
         from sklearn.compose import ColumnTransformer  # type: ignore
-        from sklearn.ensemble import RandomForestClassifier  # type: ignore
+        from sklearn.ensemble import (  # type: ignore
+            HistGradientBoostingClassifier,
+            RandomForestClassifier,
+        )
         from sklearn.metrics import classification_report, confusion_matrix  # type: ignore
         from sklearn.model_selection import train_test_split  # type: ignore
         from sklearn.pipeline import Pipeline  # type: ignore
-        from sklearn.preprocessing import OneHotEncoder, StandardScaler  # type: ignore
+        from sklearn.preprocessing import (  # type: ignore
+            OneHotEncoder,
+            OrdinalEncoder,
+            StandardScaler,
+        )
 
         modules.update(
             {
                 "ColumnTransformer": ColumnTransformer,
                 "RandomForestClassifier": RandomForestClassifier,
+                "HistGradientBoostingClassifier": HistGradientBoostingClassifier,
                 "classification_report": classification_report,
                 "confusion_matrix": confusion_matrix,
                 "train_test_split": train_test_split,
                 "Pipeline": Pipeline,
                 "OneHotEncoder": OneHotEncoder,
+                "OrdinalEncoder": OrdinalEncoder,
                 "StandardScaler": StandardScaler,
             }
         )
@@ -95,46 +136,163 @@ def _ensure_dependencies() -> _TrainingDependencies:
     return _TrainingDependencies(modules)
 
 
-def _coerce_float_map(data: Mapping[str, object]) -> Dict[str, float]:
-    """Convierte recursivamente los valores numéricos a float nativo."""
+@lru_cache(maxsize=1)
+def _load_cuml_forest():  # type: ignore[no-untyped-def]
+    """Importa el Random Forest de cuML solo cuando se pide entrenar en GPU.
+
+    Importar cuML inicializa CUDA, por lo que no se hace en
+    ``_ensure_dependencies``. Devuelve ``None`` si cuML no está disponible.
+    """
 
-    result: Dict[str, float] = {}
-    for key, value in data.items():
-        try:
-            result[key] = float(value)  # type: ignore[arg-type]
-        except (TypeError, ValueError):
-            # Se ignoran las claves no numéricas
-            continue
-    return result
+    try:
+        from cuml.ensemble import RandomForestClassifier  # type: ignore
+    except (ImportError, RuntimeError):
+        # cuML es opcional y falla al importarse en equipos sin CUDA
+        return None
+    return RandomForestClassifier
 
 
 def _normalize_report(report: Mapping[str, object]) -> Dict[str, Mapping[str, float]]:
     """Normaliza el `classification_report` para hacerlo serializable."""
 
+    # Un único recorrido: ``classification_report`` solo entrega números (que
+    # ``numbers.Real`` reconoce también en sus variantes de NumPy), por lo que
+    # basta con filtrar por tipo en lugar de intentar ``float`` valor por valor.
     normalized: Dict[str, Mapping[str, float]] = {}
     for key, value in report.items():
         if isinstance(value, Mapping):
-            normalized[key] = _coerce_float_map(value)
-        else:
-            try:
-                normalized[key] = {"score": float(value)}  # type: ignore[arg-type]
-            except (TypeError, ValueError):
-                # En último caso se omite la entrada no numérica
-                continue
+            normalized[key] = {
+                metric: float(score)
+                for metric, score in value.items()
+                if isinstance(score, Real)
+            }
+        elif isinstance(value, Real):
+            # Métricas globales como ``accuracy`` llegan como escalares
+            normalized[key] = {"score": float(value)}
     return normalized
 
 
+def _read_dataset(pd, pacsv, dataset: Path):
+    """Lee el dataset priorizando una copia Parquet más reciente que el CSV.
+
+    Si junto al CSV existe ``<nombre>.parquet`` con fecha igual o posterior se
+    lee esa copia, mucho más rápida de decodificar. En caso contrario se analiza
+    el CSV (en paralelo con pyarrow si está disponible) y se guarda la copia
+    Parquet para los siguientes entrenamientos. Devuelve el DataFrame y la ruta
+    del archivo leído.
+    """
+
+    parquet = dataset.with_suffix(".parquet")
+    try:
+        if parquet.stat().st_mtime_ns >= dataset.stat().st_mtime_ns:
+            return pd.read_parquet(parquet), parquet
+    except FileNotFoundError:
+        pass
+    except ImportError:
+        # ``read_parquet`` requiere pyarrow o fastparquet
+        pass
+    if pacsv is not None:
+        table = pacsv.read_csv(
+            dataset, read_options=pacsv.ReadOptions(use_threads=True)
+        )
+        frame = table.to_pandas()
+    else:
+        frame = pd.read_csv(dataset)
+    try:
+        frame.to_parquet(parquet, index=False)
+    except (ImportError, OSError, ValueError):
+        # Sin motor Parquet o sin permisos de escritura se sigue usando el CSV
+        pass
+    return frame, dataset
+
+
+def _split_indices(
+    np,
+    train_test_split,
+    dataset: Path,
+    y,
+    *,
+    test_size: float,
+    random_state: int,
+    source: Path | None = None,
+):
+    """Devuelve los índices de entrenamiento y validación estratificados.
+
+    Los índices se guardan en ``<nombre>.split.npz`` junto al dataset, con una
+    clave que depende de la fecha de modificación del archivo realmente leído
+    (``source``, por defecto el propio dataset), el número de filas,
+    ``test_size`` y ``random_state``; así los reentrenamientos con los mismos
+    datos no repiten la partición. Hay un único archivo por dataset, que se
+    sobrescribe cuando cambia la clave. Dividir ``np.arange`` con los mismos
+    parámetros produce exactamente la misma partición que dividir el DataFrame.
+    """
+
+    source = dataset if source is None else source
+    key = repr(
+        (source.stat().st_mtime_ns, len(y), float(test_size), random_state)
+    ).encode("utf-8")
+    digest = hashlib.sha1(key).hexdigest()
+    cache_path = dataset.with_name(f"{dataset.stem}.split.npz")
+
+    try:
+        with np.load(cache_path) as cached:
+            if str(cached["key"]) == digest:
+                return cached["train_idx"], cached["test_idx"]
+    except (OSError, KeyError, ValueError):
+        pass
+
+    train_idx, test_idx = train_test_split(
+        np.arange(len(y)),
+        test_size=test_size,
+        stratify=y,
+        random_state=random_state,
+    )
+    try:
+        np.savez(
+            cache_path, key=np.array(digest), train_idx=train_idx, test_idx=test_idx
+        )
+    except OSError:
+        # Un directorio de solo lectura no debe impedir el entrenamiento
+        pass
+    return train_idx, test_idx
+
+
+def _dump_model(joblib, pipeline, destination: Path) -> None:
+    """Guarda el pipeline con protocolo 5 y compresión lz4 si está instalada."""
+
+    # lz4 reduce varias veces el tamaño del bosque con un coste de CPU mínimo;
+    # sin la librería se escribe el pickle sin comprimir.
+    compress = ("lz4", 3) if importlib.util.find_spec("lz4") is not None else 0
+    joblib.dump(pipeline, destination, compress=compress, protocol=5)
+
+
 def train_random_forest(
     dataset_path: Path | str = DEFAULT_DATASET_PATH,
     model_path: Path | str = "verifactura_rf_model.pkl",
     *,
     test_size: float = 0.2,
     random_state: int = 42,
+    estimator: str = ESTIMATOR_RANDOM_FOREST,
+    use_gpu: bool = False,
 ) -> RandomForestTrainingResult:
-    """Entrena y guarda el modelo Random Forest con el dataset indicado."""
+    """Entrena y guarda el modelo Random Forest con el dataset indicado.
+
+    Con ``estimator="hist_gradient_boosting"`` se entrena en su lugar un
+    ``HistGradientBoostingClassifier`` que trata las columnas categóricas de
+    forma nativa, evitando la expansión one-hot. Con ``use_gpu=True`` y cuML
+    instalado, el Random Forest se entrena en la GPU; sin cuML se usa la CPU.
+    El modelo entrenado en GPU requiere cuML también para servir predicciones.
+    """
+
+    if estimator not in SUPPORTED_ESTIMATORS:
+        raise ValueError(
+            f"Estimador de entrenamiento no soportado: {estimator!r}. "
+            "Usa uno de: " + ", ".join(SUPPORTED_ESTIMATORS)
+        )
 
     deps = _ensure_dependencies()
     pd = deps["pd"]
+    np = deps["np"]
     joblib = deps["joblib"]
     ColumnTransformer = deps["ColumnTransformer"]
     OneHotEncoder = deps["OneHotEncoder"]
@@ -155,7 +313,7 @@ def train_random_forest(
     if not model_destination.parent.exists():
         model_destination.parent.mkdir(parents=True, exist_ok=True)
 
-    frame = pd.read_csv(dataset)
+    frame, source = _read_dataset(pd, deps["pacsv"], dataset)
 
     required_columns = [
         "marca",
@@ -193,39 +351,101 @@ def train_random_forest(
     categorical_features = ["marca", "tipo", "clase", "combustible"]
     numerical_features = ["capacidad", "ruedas", "total"]
 
-    preprocessor = ColumnTransformer(
-        [
-            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-            ("num", StandardScaler(), numerical_features),
-        ]
-    )
-
-    rf = RandomForestClassifier(
-        n_estimators=400,
-        max_depth=15,
-        max_features=0.6,
-        min_samples_split=5,
-        min_samples_leaf=3,
-        max_samples=0.8,
-        bootstrap=True,
-        random_state=random_state,
-        n_jobs=-1,
-    )
+    if estimator == ESTIMATOR_HIST_GRADIENT_BOOSTING:
+        OrdinalEncoder = deps["OrdinalEncoder"]
+        HistGradientBoostingClassifier = deps["HistGradientBoostingClassifier"]
+        # Las categorías se codifican como enteros (las desconocidas como -1,
+        # que el clasificador trata como faltantes) y se declaran categóricas
+        # por posición; los árboles no necesitan escalar las numéricas.
+        preprocessor = ColumnTransformer(
+            [
+                (
+                    "cat",
+                    OrdinalEncoder(
+                        handle_unknown="use_encoded_value",
+                        unknown_value=-1,
+                        max_categories=255,
+                    ),
+                    categorical_features,
+                ),
+                ("num", "passthrough", numerical_features),
+            ]
+        )
+        classifier = HistGradientBoostingClassifier(
+            categorical_features=list(range(len(categorical_features))),
+            max_iter=400,
+            max_depth=15,
+            random_state=random_state,
+        )
+    elif use_gpu and _load_cuml_forest() is not None:
+        cuRandomForestClassifier = _load_cuml_forest()
+        # cuML trabaja con matrices densas float32
+        preprocessor = ColumnTransformer(
+            [
+                (
+                    "cat",
+                    OneHotEncoder(
+                        handle_unknown="ignore",
+                        sparse_output=False,
+                        dtype=np.float32,
+                    ),
+                    categorical_features,
+                ),
+                ("num", StandardScaler(), numerical_features),
+            ]
+        )
+        from train.gpu import EncodedLabelClassifier
+
+        classifier = EncodedLabelClassifier(
+            cuRandomForestClassifier(
+                n_estimators=400,
+                max_depth=15,
+                max_features=0.6,
+                min_samples_split=5,
+                min_samples_leaf=3,
+                max_samples=0.8,
+                bootstrap=True,
+                random_state=random_state,
+                output_type="numpy",
+            )
+        )
+    else:
+        preprocessor = ColumnTransformer(
+            [
+                ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
+                ("num", StandardScaler(), numerical_features),
+            ]
+        )
+        classifier = RandomForestClassifier(
+            n_estimators=400,
+            max_depth=15,
+            max_features=0.6,
+            min_samples_split=5,
+            min_samples_leaf=3,
+            max_samples=0.8,
+            bootstrap=True,
+            random_state=random_state,
+            n_jobs=-1,
+        )
 
     pipeline = Pipeline(
         [
             ("preprocessor", preprocessor),
-            ("classifier", rf),
+            ("classifier", classifier),
         ]
     )
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
+    train_idx, test_idx = _split_indices(
+        np,
+        train_test_split,
+        dataset,
         y,
         test_size=test_size,
-        stratify=y,
         random_state=random_state,
+        source=source,
     )
+    X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
 
     pipeline.fit(X_train, y_train)
 
@@ -237,7 +457,7 @@ def train_random_forest(
     report = _normalize_report(report_raw)
     confusion = confusion_matrix(y_test, y_pred)
 
-    joblib.dump(pipeline, model_destination)
+    _dump_model(joblib, pipeline, model_destination)
 
     classes: Sequence[str] = getattr(pipeline, "classes_", [])
     class_list = [str(label) for label in classes]
@@ -248,5 +468,5 @@ def train_random_forest(
         training_samples=int(len(X_train)),
         validation_samples=int(len(X_test)),
         classification_report=report,
-        confusion_matrix=[list(map(int, row)) for row in confusion.tolist()],
+        confusion_matrix=confusion.astype(int).tolist(),
     )